@@ -0,0 +1,171 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+"""Throughput and latency of offer listing checks over sequential HTTP versus the asyncio
+engine, against a local mock server.
+
+The server runs in a separate process and answers every request with the same offer
+listing after a fixed delay, standing in for Amazon's response time.  Every response is
+parsed and ranked the way a real check would be; no offer is ever in the reserve window.
+
+python -m benchmarks.async_engine
+"""
+
+import asyncio
+import logging
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmarks.corpus import aod_container_html
+from stores.amazon import (
+    AmazonItemCondition,
+    offers_in_reserve,
+    parse_offer_snapshots,
+    rank_offers,
+)
+from utils.async_http import RequestBudget, client_session, scan
+from utils.http import TimeoutHTTPAdapter
+
+SERVER = """
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+latency = float(sys.argv[1])
+body = sys.stdin.read().encode()
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+Handler.protocol_version = "HTTP/1.1"
+Handler.disable_nagle_algorithm = True
+ThreadingHTTPServer.request_queue_size = 128
+server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+print(server.server_address[1], flush=True)
+server.serve_forever()
+"""
+
+LATENCY = 0.1  # seconds the server takes to answer
+CHECKS = 100
+
+
+def evaluate(listing):
+    return rank_offers(
+        offers_in_reserve(parse_offer_snapshots(listing), 0, 1),
+        AmazonItemCondition.New,
+    )
+
+
+def sequential(url, checks):
+    session = requests.Session()
+    session.mount("http://", TimeoutHTTPAdapter(max_retries=0))
+    latencies = []
+    for _ in range(checks):
+        started = time.monotonic()
+        evaluate(session.get(url).text)
+        latencies.append(time.monotonic() - started)
+    return latencies, time.monotonic()
+
+
+def concurrent(url, checks, concurrency, rate):
+    latencies = []
+
+    def timed_jobs():
+        for key in range(checks):
+            started[key] = time.monotonic()
+            yield key, url
+
+    def timed_evaluate(key, status, text):
+        evaluate(text)
+        finished[0] = time.monotonic()
+        latencies.append(finished[0] - started[key])
+
+    started = {}
+    finished = [None]
+
+    async def run():
+        async with client_session(concurrency=concurrency) as session:
+            await scan(
+                session, timed_jobs(), timed_evaluate, RequestBudget(rate), concurrency
+            )
+
+    asyncio.run(run())
+    # Workers still waiting for a slot when the jobs run out don't count
+    return latencies, finished[0]
+
+
+def report(name, checks, elapsed, latencies):
+    latencies = sorted(latencies)
+    print(
+        f"  {name:<30} {checks / elapsed:7.1f} checks/s  "
+        f"median {statistics.median(latencies) * 1000:6.1f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.1f} ms"
+    )
+
+
+def main(checks=CHECKS):
+    # Log file writes would land inside the timings
+    logging.disable(logging.CRITICAL)
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER, str(LATENCY)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        server.stdin.write(aod_container_html("smile.amazon.com", 10))
+        server.stdin.close()
+        url = f"http://127.0.0.1:{int(server.stdout.readline())}/gp/aod/ajax"
+        print(f"{checks} checks, server answering after {LATENCY * 1000:.0f} ms")
+        runs = [("sequential requests", lambda: sequential(url, checks))]
+        for concurrency in (4, 16):
+            runs.append(
+                (
+                    f"asyncio, {concurrency} in flight",
+                    lambda concurrency=concurrency: concurrent(
+                        url, checks, concurrency, 1e6
+                    ),
+                )
+            )
+        runs.append(
+            ("asyncio, 16 in flight, 20 rps", lambda: concurrent(url, checks, 16, 20))
+        )
+        for name, run in runs:
+            started = time.monotonic()
+            latencies, finished = run()
+            report(name, checks, finished - started, latencies)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+"""Offer listing markup modelled on saved AOD pages, used by the benchmarks"""
+
+import json
+import random
+
+# Price and shipping strings as Amazon prints them on each domain
+DOMAIN_PRICES = {
+    "smile.amazon.com": ["$749.99", "$1,199.00", "$699.00", "$2,049.95"],
+    "www.amazon.ca": ["CDN$ 999.99", "CDN$1,349.00", "$1,099.99"],
+    "www.amazon.co.uk": ["£649.99", "£1,049.00", "£719.98"],
+    "www.amazon.de": ["749,99 €", "1.199,00 €", "699,00&nbsp;€", "2.049,95 €"],
+    "www.amazon.fr": ["749,99 €", "1 199,00 €", "699,00&nbsp;€"],
+    "www.amazon.it": ["749,99 €", "1.199,00 €", "2.049,95&nbsp;€"],
+    "www.amazon.es": ["749,99 €", "1.199,00 €", "699,00&nbsp;€"],
+    "www.amazon.nl": ["€ 749,99", "€ 1.199,00", "€749,99"],
+    "www.amazon.co.jp": ["￥89,800", "￥124,980", "¥99,800"],
+    "www.amazon.sg": ["S$1,049.00", "S$ 999.99"],
+}
+
+SHIPPING_TEMPLATES = [
+    # v3: delivery price attribute
+    '<div id="mir-layout-DELIVERY_BLOCK"><span data-csa-c-delivery-price="FREE">'
+    "FREE delivery <b>Tuesday, March 2</b></span></div>",
+    '<div id="mir-layout-DELIVERY_BLOCK"><span data-csa-c-delivery-price="{shipping}">'
+    "{shipping} delivery <b>March 4 - 8</b></span></div>",
+    # v2: delivery message div
+    '<div id="delivery-message">FREE Delivery</div>',
+    '<div id="delivery-message">+ {shipping} shipping</div>',
+    # alt: element after the bottling deposit fee div
+    '<div id="aod-bottlingDepositFee-{idx}"></div>'
+    '<div class="a-row aod-ship-charge"><span class="a-size-base a-color-base">+</span>'
+    '<span class="a-size-base a-color-base">{shipping}</span>'
+    '<span class="a-size-base a-color-base">shipping</span></div>',
+    '<div id="aod-bottlingDepositFee-{idx}"></div>'
+    '<span class="a-size-base a-color-secondary"><b>FREE Shipping</b></span>',
+    '<div id="aod-bottlingDepositFee-{idx}"></div>'
+    '<span class="a-size-base"><i class="a-icon a-icon-prime" aria-label="Free Shipping for Prime members"></i></span>',
+]
+
+CONDITIONS = ["new", "new", "new", "used", "col"]
+
+OFFER_TEMPLATE = """
+<div id="{div_id}" class="a-section a-spacing-none a-padding-base aod-information-block aod-clear-float">
+ <div id="aod-price-{idx}" class="a-section a-spacing-none aod-offer-price">
+  <span class="a-price" data-a-size="xl"><span class="a-offscreen">{price}</span>
+   <span aria-hidden="true"><span class="a-price-whole">{price}</span></span></span>
+ </div>
+ {shipping_block}
+ <div id="aod-offer-heading" class="a-row"><h5>{condition_text}</h5></div>
+ <div id="aod-offer-shipsFrom" class="a-fixed-left-grid"><div class="a-fixed-left-grid-inner">
+  <div class="a-fixed-left-grid-col a-col-right"><span class="a-size-small a-color-base">Amazon</span></div>
+ </div></div>
+ <div id="aod-offer-soldBy" class="a-fixed-left-grid"><div class="a-fixed-left-grid-inner">
+  <div class="a-fixed-left-grid-col a-col-right">
+   <a class="a-size-small a-link-normal" href="/gp/aag/main?seller=A{idx}">{seller}</a>
+  </div>
+ </div></div>
+ <div class="a-section a-spacing-none aod-atc-column">
+  <span data-action="aod-atc-action" data-aod-atc-action='{atc_action}'>
+   <span class="a-button a-button-primary"><span class="a-button-inner">
+    <input name="submit.addToCart" class="a-button-input" type="submit" aria-labelledby="a-autoid-{idx}-announce">
+   </span></span>
+  </span>
+  <form method="get" action="/gp/aod/ajax/ref=aod_f_{condition}_{idx}"></form>
+ </div>
+</div>
+"""
+
+
+def offer_html(domain, idx, pinned=False, rng=random):
+    prices = DOMAIN_PRICES[domain]
+    condition = rng.choice(CONDITIONS)
+    atc_action = json.dumps(
+        {"oid": f"OID{idx:04d}{domain[-2:].upper()}X", "asin": "B08HR7SV3M"}
+    )
+    return OFFER_TEMPLATE.format(
+        div_id="aod-pinned-offer" if pinned else "aod-offer",
+        idx=idx,
+        price=rng.choice(prices),
+        shipping_block=rng.choice(SHIPPING_TEMPLATES).format(
+            idx=idx, shipping=rng.choice(prices)
+        ),
+        condition=condition,
+        condition_text=condition.capitalize(),
+        seller=f"Seller {idx}",
+        atc_action=atc_action,
+    )
+
+
+def aod_container_html(domain, offer_count=10, seed=0):
+    """An AOD container with a pinned offer followed by a list of offers"""
+    rng = random.Random(seed)
+    offers = [offer_html(domain, 0, pinned=True, rng=rng)]
+    offers.append('<div id="aod-offer-list">')
+    offers.extend(offer_html(domain, idx, rng=rng) for idx in range(1, offer_count))
+    offers.append("</div>")
+    return '<div id="aod-container">' + "".join(offers) + "</div>"
+
+
+def corpus(offer_count=10, seed=0):
+    """One AOD container per domain"""
+    return {
+        domain: aod_container_html(domain, offer_count, seed)
+        for domain in DOMAIN_PRICES
+    }
+
+
+def price_strings():
+    return {domain: list(prices) for domain, prices in DOMAIN_PRICES.items()}
@@ -0,0 +1,131 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+"""Round trip latency of the same read-only probes through chromedriver versus the direct
+DevTools channel.
+
+Needs Chrome and the chromedriver from chromedriver_py.  A headless browser loads a
+local copy of an offer listing, and each probe is timed over both channels.  Set
+CHROME_BINARY to use a Chrome that isn't installed where chromedriver looks for it.
+
+python -m benchmarks.devtools_channel
+"""
+
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from chromedriver_py import binary_path
+from selenium import webdriver
+
+from benchmarks.corpus import aod_container_html
+from stores.amazon import (
+    AOD_REGION_IDS,
+    OFFER_REGION_SCRIPT,
+    PAGE_SIGNATURE_SCRIPT,
+    PAGE_SIGNATURES,
+)
+from utils.devtools import DevToolsChannel
+from utils.selenium_utils import enable_headless, options
+
+PAGE = "<html><head><title>Buy Now</title></head><body>{}</body></html>"
+
+
+def webdriver_probes(driver, screenshot_file):
+    signatures = [selector for _, selector in PAGE_SIGNATURES]
+    return {
+        "title": lambda: driver.title,
+        "page signature": lambda: driver.execute_script(
+            PAGE_SIGNATURE_SCRIPT, signatures
+        ),
+        "offer region": lambda: driver.execute_script(
+            OFFER_REGION_SCRIPT, AOD_REGION_IDS
+        ),
+        "screenshot": lambda: driver.save_screenshot(screenshot_file),
+    }
+
+
+def devtools_probes(channel, screenshot_file):
+    signatures = [selector for _, selector in PAGE_SIGNATURES]
+    return {
+        "title": channel.title,
+        "page signature": lambda: channel.execute_script(
+            PAGE_SIGNATURE_SCRIPT, signatures
+        ),
+        "offer region": lambda: channel.execute_script(
+            OFFER_REGION_SCRIPT, AOD_REGION_IDS
+        ),
+        "screenshot": lambda: channel.screenshot(screenshot_file),
+    }
+
+
+def round_trips(probe, number):
+    probe()
+    times = []
+    for _ in range(number):
+        started = time.perf_counter()
+        probe()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), max(times)
+
+
+def main(number=200):
+    # Log file writes would land inside the timings
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as directory:
+        page_file = os.path.join(directory, "offers.html")
+        with open(page_file, "w", encoding="utf-8") as f:
+            f.write(PAGE.format(aod_container_html("smile.amazon.com", 10)))
+        screenshot_file = os.path.join(directory, "screenshot.png")
+
+        enable_headless()
+        if os.environ.get("CHROME_BINARY"):
+            options.binary_location = os.environ["CHROME_BINARY"]
+        try:
+            driver = webdriver.Chrome(executable_path=binary_path, options=options)
+        except Exception as e:
+            print(f"Could not start Chrome: {e}")
+            return
+        channel = DevToolsChannel()
+        try:
+            driver.get("file://" + page_file)
+            if not channel.connect(driver):
+                print("Could not open the DevTools channel")
+                return
+            channels = [
+                ("webdriver", webdriver_probes(driver, screenshot_file)),
+                ("devtools", devtools_probes(channel, screenshot_file)),
+            ]
+            print(f"Median (max) round trip over {number} calls")
+            for probe in channels[0][1]:
+                for name, probes in channels:
+                    median, worst = round_trips(probes[probe], number)
+                    print(
+                        f"  {probe + ' / ' + name:<27} {median * 1000:8.3f} ms"
+                        f"  ({worst * 1000:.3f} ms)"
+                    )
+        finally:
+            channel.close()
+            driver.quit()
+
+
+if __name__ == "__main__":
+    main()
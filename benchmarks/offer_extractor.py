@@ -0,0 +1,161 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+"""Per-offer cost of the single-pass offer extractor versus the cascaded parsers it replaced.
+
+python -m benchmarks.offer_extractor
+"""
+
+import json
+import logging
+import timeit
+
+from lxml import etree, html
+
+from benchmarks.corpus import corpus
+from stores import amazon
+from stores.amazon import (
+    FREE_SHIPPING_PRICE,
+    extract_offer_fields,
+    get_item_condition,
+    load_free_shipping_phrases,
+    price_parser,
+)
+
+FREE_SHIPPING = [
+    "FREE SHIPPING",
+    "FREE DELIVERY",
+    "PRIME FREE DELIVERY",
+    "GRATIS-LIEFERUNG",
+    "LIVRAISON GRATUITE",
+]
+
+# The per-offer work as it was done before the extractor: one XPath per field and
+# v3 -> v2 -> alt shipping lookups that each walk the offer again
+ATC_BUTTON = etree.XPath(".//input[@name='submit.addToCart']")
+CONDITION_FORM = etree.XPath("./following::form[@method='get']")
+ATC_ACTION = etree.XPath(
+    "./ancestor::span[@data-action='aod-atc-action']/@data-aod-atc-action"
+)
+SELLER = etree.XPath(
+    ".//div[@id='aod-offer-soldBy']//a/text() | "
+    ".//div[@id='aod-offer-soldBy']//span[contains(@class, 'a-color-base')]/text()"
+)
+PRICE = etree.XPath(".//span[contains(@class, 'a-price')]//span[@class='a-offscreen']")
+SHIPPING_PRICE = etree.XPath(".//span/@data-csa-c-delivery-price")
+DELIVERY_MESSAGE = etree.XPath(".//div[@id='delivery-message']")
+ALT_SHIPPING = etree.XPath(
+    ".//div[starts-with(@id, 'aod-bottlingDepositFee-')]/following-sibling::*[1]"
+)
+ALT_SHIPPING_SPANS = etree.XPath(".//span")
+ALT_SHIPPING_ICONS = etree.XPath("//i[@aria-label]")
+
+
+def cascaded_shipping(tree):
+    nodes = SHIPPING_PRICE(tree)
+    if nodes:
+        text = nodes[0].upper()
+        if any(text in message for message in ["FREE", "FASTEST"]):
+            return FREE_SHIPPING_PRICE
+        return price_parser.parse(text)
+    nodes = DELIVERY_MESSAGE(tree)
+    if nodes and nodes[0].text:
+        text = nodes[0].text.strip()
+        if any(text.upper() in message for message in FREE_SHIPPING):
+            return FREE_SHIPPING_PRICE
+        cost = price_parser.parse(text)
+        if cost.currency is not None:
+            return cost
+    nodes = ALT_SHIPPING(tree)
+    if not nodes:
+        return FREE_SHIPPING_PRICE
+    node = nodes[0]
+    text = node.text.strip() if node.text else ""
+    if node.tag == "div":
+        for span in ALT_SHIPPING_SPANS(node):
+            if span.text and span.text != "+":
+                cost = price_parser.parse(span.text)
+                if cost.currency is not None:
+                    return cost
+    elif node.tag == "span":
+        spans = node.findall("span")
+        bs = node.findall("b")
+        icons = ALT_SHIPPING_ICONS(node)
+        if spans:
+            if spans[0].text.startswith("+"):
+                return price_parser.parse(spans[0].text)
+        elif bs:
+            [b.text.upper() in FREE_SHIPPING for b in bs]
+        elif icons:
+            "FREE" in icons[0].attrib["aria-label"].upper()
+        else:
+            any(text.upper() in message for message in FREE_SHIPPING)
+    return FREE_SHIPPING_PRICE
+
+
+def cascaded_offer_fields(offer):
+    atc_button = ATC_BUTTON(offer)[0]
+    forms = CONDITION_FORM(atc_button)
+    condition = get_item_condition(forms[0].get("action", "")) if forms else None
+    actions = ATC_ACTION(atc_button)
+    offering_id = json.loads(actions[0])["oid"] if actions else None
+    sellers = SELLER(offer)
+    prices = PRICE(offer)
+    return (
+        price_parser.parse(prices[0].text_content()) if prices else None,
+        cascaded_shipping(offer),
+        condition,
+        offering_id,
+        sellers[0].strip() if sellers else None,
+    )
+
+
+def main(repeat=5, number=20):
+    load_free_shipping_phrases(FREE_SHIPPING)
+    offers = []
+    for region_html in corpus(offer_count=15).values():
+        offers.extend(amazon.AOD_OFFERS_XPATH(html.fromstring(region_html)))
+
+    for offer in offers:
+        before = cascaded_offer_fields(offer)
+        after = extract_offer_fields(offer)
+        assert before[1].amount == after.shipping.amount, etree.tostring(offer)
+        assert before[3] == after.offering_id
+
+    def cascaded():
+        for offer in offers:
+            cascaded_offer_fields(offer)
+
+    def single_pass():
+        for offer in offers:
+            extract_offer_fields(offer)
+
+    per_offer = number * len(offers)
+    # Keep the log file writes of either path out of the measurement
+    logging.disable(logging.CRITICAL)
+    before = min(timeit.repeat(cascaded, repeat=repeat, number=number))
+    after = min(timeit.repeat(single_pass, repeat=repeat, number=number))
+    logging.disable(logging.NOTSET)
+    print(f"{len(offers)} offers across {len(corpus(offer_count=1))} domains")
+    print(f"  cascaded parsers:  {before / per_offer * 1e6:8.2f} us/offer")
+    print(f"  single pass:       {after / per_offer * 1e6:8.2f} us/offer")
+
+
+if __name__ == "__main__":
+    main()
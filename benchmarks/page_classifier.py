@@ -0,0 +1,107 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+"""Title classification latency of the if/elif list scans versus the title index.
+
+python -m benchmarks.page_classifier
+"""
+
+import timeit
+
+from config import Config
+
+from stores import amazon
+from stores.amazon import PAGE_TITLE_KEYS
+from utils.page_classifier import PageClassifier
+
+UNKNOWN_TITLES = [
+    "",
+    "Amazon.com: NVIDIA GeForce RTX 3080 Founders Edition",
+    "Page Not Found",
+]
+ACCOUNT_TEXTS = ["Hello, Sign in", "Hello, Jane", "Hallo, Anmelden", "ログイン"]
+
+
+def chained(title_config, title):
+    # The classification navigate_pages used to do: one list scan per page kind
+    for key in PAGE_TITLE_KEYS:
+        if title in title_config[key]:
+            return key
+    return None
+
+
+def main(repeat=5, number=2000):
+    title_config = Config("config/fairgame.conf")["AMAZON"]
+    titles = [title for key in PAGE_TITLE_KEYS for title in title_config[key]]
+    titles.extend(UNKNOWN_TITLES)
+
+    print(f"{len(titles)} titles, {len(PAGE_TITLE_KEYS)} title lists")
+    for domain in ["smile.amazon.com", "www.amazon.de"]:
+        classifier = PageClassifier()
+        classifier.load(title_config, PAGE_TITLE_KEYS, domain)
+        for title in titles:
+            assert chained(title_config, title) == classifier.classify(title), title
+
+        lookups = number * len(titles)
+        before = min(
+            timeit.repeat(
+                lambda: [chained(title_config, title) for title in titles],
+                repeat=repeat,
+                number=number,
+            )
+        )
+        after = min(
+            timeit.repeat(
+                lambda: [classifier.classify(title) for title in titles],
+                repeat=repeat,
+                number=number,
+            )
+        )
+        print(f"{domain} ({len(classifier.index)} titles in locale)")
+        print(f"  list scans:   {before / lookups * 1e6:8.3f} us/title")
+        print(f"  title index:  {after / lookups * 1e6:8.3f} us/title")
+
+    # The is_logged_in check
+    sign_in_text = title_config["SIGN_IN_TEXT"]
+    amazon.load_sign_in_text(sign_in_text)
+    lookups = number * len(ACCOUNT_TEXTS)
+    before = min(
+        timeit.repeat(
+            lambda: [
+                any(sign_in in text for sign_in in sign_in_text)
+                for text in ACCOUNT_TEXTS
+            ],
+            repeat=repeat,
+            number=number,
+        )
+    )
+    after = min(
+        timeit.repeat(
+            lambda: [amazon.sign_in_text_re.search(text) for text in ACCOUNT_TEXTS],
+            repeat=repeat,
+            number=number,
+        )
+    )
+    print("SIGN_IN_TEXT")
+    print(f"  substring scan:  {before / lookups * 1e6:8.3f} us/text")
+    print(f"  compiled regex:  {after / lookups * 1e6:8.3f} us/text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+"""Price parsing cost per string: price_parser versus the locale fast path and cache.
+
+python -m benchmarks.price_parser
+"""
+
+import re
+import timeit
+
+from price_parser import parse_price
+
+from benchmarks.corpus import price_strings
+from utils.prices import PriceParser
+
+
+def legacy_parse(text):
+    return parse_price(re.sub(r"(?:\s+|(?:&nbsp;)+)", "", text.strip()))
+
+
+def main(repeat=5, number=2000):
+    print(
+        f"{'domain':<18}{'parse_price':>14}{'fast path':>14}{'cached':>14}  (us/string)"
+    )
+    for domain, strings in price_strings().items():
+        parser = PriceParser(domain)
+        for text in strings:
+            assert parser.parse(text).amount == legacy_parse(text).amount, text
+
+        def legacy():
+            for text in strings:
+                legacy_parse(text)
+
+        def uncached():
+            parser.parse.cache_clear()
+            for text in strings:
+                parser.parse(text)
+
+        def cached():
+            for text in strings:
+                parser.parse(text)
+
+        per_string = number * len(strings)
+        results = [
+            min(timeit.repeat(fn, repeat=repeat, number=number)) / per_string * 1e6
+            for fn in (legacy, uncached, cached)
+        ]
+        print(f"{domain:<18}" + "".join(f"{result:>14.2f}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+"""CPU time per simulated stock check for the old spin loops versus utils.wait.
+
+A stub WebDriver server runs in a separate process, so every poll pays for a real HTTP
+round trip through urllib3 the way a Selenium command does, while only this process's
+CPU time is measured.  Each check waits for the offers, prices and shipping to "load".
+
+python -m benchmarks.wait_cpu
+"""
+
+import subprocess
+import sys
+import time
+
+import urllib3
+
+from utils.wait import wait_until
+
+SERVER = """
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'{"value": ""}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+Handler.protocol_version = "HTTP/1.1"
+Handler.disable_nagle_algorithm = True
+server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+print(server.server_address[1], flush=True)
+server.serve_forever()
+"""
+
+# Seconds after the start of a check at which each part of the page shows up
+LOAD_TIMES = [0.4, 0.6, 0.8]
+TIMEOUT = 10
+
+
+class StubDriver:
+    def __init__(self, port):
+        self.pool = urllib3.HTTPConnectionPool("127.0.0.1", port, maxsize=1)
+        self.round_trips = 0
+
+    def command(self):
+        self.round_trips += 1
+        return self.pool.request("GET", "/session/stub/element").data
+
+
+def spin_check(driver, started):
+    for load_time in LOAD_TIMES:
+        timeout = time.time() + TIMEOUT
+        while True:
+            driver.command()
+            if time.monotonic() - started >= load_time:
+                break
+            if time.time() > timeout:
+                return False
+    return True
+
+
+def wait_check(driver, started):
+    for load_time in LOAD_TIMES:
+        if not wait_until(
+            lambda: driver.command() and time.monotonic() - started >= load_time,
+            timeout=TIMEOUT,
+        ):
+            return False
+    return True
+
+
+def measure(driver, check, checks):
+    driver.round_trips = 0
+    cpu = time.process_time()
+    wall = time.monotonic()
+    for _ in range(checks):
+        check(driver, time.monotonic())
+    cpu = time.process_time() - cpu
+    wall = time.monotonic() - wall
+    return cpu / checks, wall / checks, driver.round_trips / checks
+
+
+def main(checks=5):
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER], stdout=subprocess.PIPE, text=True
+    )
+    try:
+        driver = StubDriver(int(server.stdout.readline()))
+        print(f"{checks} checks, page parts loading after {LOAD_TIMES} s")
+        for name, check in [("spin loops", spin_check), ("wait_until", wait_check)]:
+            cpu, wall, round_trips = measure(driver, check, checks)
+            print(
+                f"  {name:<11} {cpu * 1000:8.1f} ms CPU/check  "
+                f"{wall:5.2f} s wall/check  {round_trips:7.0f} round trips/check"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
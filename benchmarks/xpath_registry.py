@@ -0,0 +1,96 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+"""Per-offer cost of string XPath evaluation versus the precompiled registry.
+
+python -m benchmarks.xpath_registry
+"""
+
+import timeit
+
+from config import Config
+from lxml import html
+
+from benchmarks.corpus import corpus
+from stores import amazon
+from stores.amazon import join_xpaths, xpaths
+
+OFFER_EXPRESSIONS = [
+    ".//input[@name='submit.addToCart']",
+    ".//span[contains(@class, 'a-price')]//span[@class='a-offscreen']",
+    ".//span/@data-csa-c-delivery-price",
+    ".//div[@id='delivery-message']",
+    ".//div[starts-with(@id, 'aod-bottlingDepositFee-')]/following-sibling::*[1]",
+]
+
+
+def offers():
+    found = []
+    for region_html in corpus(offer_count=15).values():
+        found.extend(amazon.AOD_OFFERS_XPATH(html.fromstring(region_html)))
+    return found
+
+
+def main(repeat=5, number=20):
+    offer_nodes = offers()
+    compiled = [xpaths.compile(expression) for expression in OFFER_EXPRESSIONS]
+
+    def string_xpaths():
+        for offer in offer_nodes:
+            for expression in OFFER_EXPRESSIONS:
+                offer.xpath(expression)
+
+    def compiled_xpaths():
+        for offer in offer_nodes:
+            for expression in compiled:
+                expression(offer)
+
+    per_offer = number * len(offer_nodes)
+    before = min(timeit.repeat(string_xpaths, repeat=repeat, number=number))
+    after = min(timeit.repeat(compiled_xpaths, repeat=repeat, number=number))
+    print(f"{len(offer_nodes)} offers, {len(OFFER_EXPRESSIONS)} expressions per offer")
+    print(f"  tree.xpath(str):  {before / per_offer * 1e6:8.2f} us/offer")
+    print(f"  etree.XPath:      {after / per_offer * 1e6:8.2f} us/offer")
+    print(f"  saved:            {(before - after) / per_offer * 1e6:8.2f} us/offer")
+
+    xpath_config = Config("config/fairgame.conf")["AMAZON"]["XPATHS"]
+    xpaths.load(xpath_config)
+    keys = list(xpath_config.keys())
+    lookups = number * 1000 * len(keys)
+    before = min(
+        timeit.repeat(
+            lambda: [join_xpaths(xpath_config[key]) for key in keys],
+            repeat=repeat,
+            number=number * 1000,
+        )
+    )
+    after = min(
+        timeit.repeat(
+            lambda: [xpaths.get(key) for key in keys],
+            repeat=repeat,
+            number=number * 1000,
+        )
+    )
+    print(f"XPATHS lookups over {len(keys)} keys")
+    print(f"  join_xpaths:      {before / lookups * 1e9:8.1f} ns/lookup")
+    print(f"  pre-joined:       {after / lookups * 1e9:8.1f} ns/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,10 +29,15 @@ from signal import SIGINT, signal
 
 import click
 
-from common.globalconfig import AMAZON_CREDENTIAL_FILE, GlobalConfig
+from common.globalconfig import (
+    AMAZON_CREDENTIAL_FILE,
+    SELECTOR_STATS_FILE,
+    GlobalConfig,
+)
 from notifications.notifications import NotificationHandler, TIME_FORMAT
 from stores.amazon import Amazon
 from utils.logger import log
+from utils.selector_stats import SelectorStats
 from utils.version import is_latest, version, get_latest_version
 
 LICENSE_PATH = os.path.join(
@@ -198,6 +203,96 @@ def main():
     default=False,
     help="Wait if captcha could not be solved. Only occurs if enters captcha handler during checkout.",
 )
+@click.option(
+    "--snapshot-offers",
+    is_flag=True,
+    default=False,
+    help="Read the offer listing in one call and parse it locally instead of querying each offer element",
+)
+@click.option(
+    "--check-timeout",
+    type=float,
+    default=20.0,
+    help="Most time to spend checking a single ASIN, including page load retries",
+)
+@click.option(
+    "--devtools-probes",
+    is_flag=True,
+    default=False,
+    help="Experimental, unmeasured: read titles, offers and screenshots over a direct DevTools connection to the browser",
+)
+@click.option(
+    "--capture-offers",
+    is_flag=True,
+    default=False,
+    help="Parse the offer listing from its network response instead of waiting for it to render",
+)
+@click.option(
+    "--fetch-offers",
+    is_flag=True,
+    default=False,
+    help="Fetch offer listings from inside the open Amazon page instead of loading each product page",
+)
+@click.option(
+    "--fetch-batch",
+    type=int,
+    default=1,
+    help="Number of ASINs whose offer listings are fetched together with --fetch-offers",
+)
+@click.option(
+    "--block-requests",
+    is_flag=True,
+    default=False,
+    help="Keep the URLs in STOCK_CHECK_BLOCKED_URLS from loading while checking stock",
+)
+@click.option(
+    "--report-transfer",
+    is_flag=True,
+    default=False,
+    help="Log the bytes transferred by each stock check",
+)
+@click.option(
+    "--http-offers",
+    is_flag=True,
+    default=False,
+    help="Fetch offer listings over plain HTTP with the browser's cookies. Chrome is only used to check out",
+)
+@click.option(
+    "--async-offers",
+    is_flag=True,
+    default=False,
+    help="Fetch offer listings for several ASINs at once over HTTP, paced by --rps instead of --delay",
+)
+@click.option(
+    "--rps",
+    type=click.FloatRange(min=0, min_open=True),
+    default=2.0,
+    help="Most offer listing requests per second with --async-offers, across all ASINs",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=4,
+    help="Most offer listing requests in flight at once with --async-offers",
+)
+@click.option(
+    "--tabs",
+    type=int,
+    default=1,
+    help="Number of tabs loading offer pages side by side in the one browser",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=0,
+    help="Number of extra browsers checking stock side by side, leaving this one to check out",
+)
+@click.option(
+    "--hot-spare",
+    is_flag=True,
+    default=False,
+    help="Keep a logged-in standby browser to switch to when the current one fails",
+)
 @notify_on_crash
 def amazon(
     no_image,
@@ -219,7 +314,27 @@ def amazon(
     clean_credentials,
     alt_checkout,
     captcha_wait,
+    snapshot_offers,
+    check_timeout,
+    devtools_probes,
+    capture_offers,
+    fetch_offers,
+    fetch_batch,
+    block_requests,
+    report_transfer,
+    http_offers,
+    async_offers,
+    rps,
+    concurrency,
+    tabs,
+    workers,
+    hot_spare,
 ):
+    if tabs > 1 and (fetch_offers or capture_offers or http_offers):
+        # The tab pool reads each tab's rendered offers, so these would be left unused
+        raise click.UsageError(
+            "--tabs can't be combined with --fetch-offers, --capture-offers or --http-offers"
+        )
     notification_handler.sound_enabled = not disable_sound
     if not notification_handler.sound_enabled:
         log.info("Local sounds have been disabled.")
@@ -252,6 +367,21 @@ def amazon(
         shipping_bypass=shipping_bypass,
         alt_checkout=alt_checkout,
         wait_on_captcha_fail=captcha_wait,
+        snapshot_offers=snapshot_offers,
+        check_timeout=check_timeout,
+        devtools_probes=devtools_probes,
+        capture_offers=capture_offers,
+        fetch_offers=fetch_offers,
+        fetch_batch=fetch_batch,
+        block_requests=block_requests,
+        report_transfer=report_transfer,
+        http_offers=http_offers,
+        async_offers=async_offers,
+        rps=rps,
+        concurrency=concurrency,
+        tabs=tabs,
+        workers=workers,
+        hot_spare=hot_spare,
     )
     try:
         amzn_obj.run(delay=delay, test=test)
@@ -409,6 +539,25 @@ def show_traceroutes(domain):
         log.info(f" {trace_command}{endpoint}")
 
 
+@click.command()
+@click.option(
+    "--domain",
+    help="Only show the statistics for one domain (e.g. smile.amazon.com, www.amazon.de).",
+)
+def show_selector_stats(domain):
+    if not os.path.exists(SELECTOR_STATS_FILE):
+        log.info(f"No selector statistics recorded yet in {SELECTOR_STATS_FILE}")
+        return
+    stats = SelectorStats()
+    stats.load(SELECTOR_STATS_FILE, domain)
+    current = None
+    for stats_domain, key, expression, hits, share in stats.report(domain):
+        if (stats_domain, key) != current:
+            current = (stats_domain, key)
+            log.info(f"{stats_domain} {key}:")
+        log.info(f"  {hits:7d} hits {share:6.1%}  {expression}")
+
+
 # Register Signal Handler for Interrupt
 signal(SIGINT, interrupt_handler)
 
@@ -417,6 +566,7 @@ main.add_command(test_notifications)
 main.add_command(show)
 main.add_command(find_endpoints)
 main.add_command(show_traceroutes)
+main.add_command(show_selector_stats)
 
 # Global scope stuff here
 if is_latest():
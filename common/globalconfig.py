@@ -26,6 +26,7 @@ from utils.logger import log
 
 GLOBAL_CONFIG_FILE = "config/fairgame.conf"
 AMAZON_CREDENTIAL_FILE = "config/amazon_credentials.json"
+SELECTOR_STATS_FILE = "config/selector_stats.json"
 
 
 def await_credential_input():
@@ -17,19 +17,27 @@
 #      The author may be contacted through the project's GitHub, at:
 #      https://github.com/Hari-Nagarajan/fairgame
 
+import asyncio
+import copy
 import fileinput
+import hashlib
+import itertools
 import json
 import math
 import os
 import platform
-import time
+import queue
 import re
+import threading
+import time
+from collections import Counter
 from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
-from typing import List
+from typing import List, NamedTuple, Optional
 
 import psutil
+import requests
 from amazoncaptcha import AmazonCaptcha
 from chromedriver_py import binary_path  # this will get you the path variable
 from furl import furl
@@ -45,10 +53,32 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 import utils.selenium_utils
+from common.globalconfig import SELECTOR_STATS_FILE
 from utils import discord_presence as presence
 from utils.debugger import debug
+from utils.async_http import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE,
+    RequestBudget,
+    client_session,
+    scan,
+)
+from utils.devtools import DevToolsChannel, DevToolsError
+from utils.http import DriverSession
 from utils.logger import log
+from utils.page_classifier import PageClassifier
+from utils.page_events import (
+    PERFORMANCE_LOG_CAPABILITY,
+    PERFORMANCE_LOG_NETWORK_PREFS,
+    PERFORMANCE_LOG_PREFS,
+    PageEvents,
+)
+from utils.prices import PriceParser
+from utils.selector_stats import SelectorStats
 from utils.selenium_utils import options, enable_headless
+from utils.wait import DEFAULT_POLL_INTERVAL, Deadline, poll, wait_until
+from utils.watchdog import DriverHungException, Watchdog
+from utils.xpath_registry import XPathRegistry
 
 # Optional OFFER_URL is:     "OFFER_URL": "https://{domain}/dp/",
 AMAZON_URLS = {
@@ -58,6 +88,7 @@ AMAZON_URLS = {
     "CART_URL": "https://{domain}/gp/cart/view.html",
     "ATC_URL": "https://{domain}/gp/aws/cart/add.html",
     "BIN_URL": "https://{domain}/gp/checkoutportal/enter-checkout.html",
+    "AOD_URL": "https://{domain}/gp/aod/ajax?pc=dp&asin=",
 }
 CHECKOUT_URL = "https://{domain}/gp/cart/desktop/go-to-checkout.html/ref=ox_sc_proceed?partialCheckoutCart=1&isToBeGiftWrappedBefore=0&proceedToRetailCheckout=Proceed+to+checkout&proceedToCheckout=1&cartInitiateId={cart_id}"
 
@@ -79,6 +110,8 @@ BUTTON_XPATHS = [
 # //*[@id="primeAutomaticPopoverAdContent"]/div/div/div[1]/a
 # //*[@id="primeAutomaticPopoverAdContent"]/div/div/div[1]/a
 FREE_SHIPPING_PRICE = parse_price("0.00")
+# Values of the data-csa-c-delivery-price attribute that mean free shipping
+DELIVERY_PRICE_FREE = frozenset(["FREE", "FASTEST"])
 
 DEFAULT_MAX_CHECKOUT_LOOPS = 20
 DEFAULT_MAX_PTC_TRIES = 3
@@ -91,8 +124,285 @@ MAX_CHECKOUT_BUTTON_WAIT = 3  # integers only
 DEFAULT_REFRESH_DELAY = 3
 DEFAULT_MAX_TIMEOUT = 10
 DEFAULT_MAX_URL_FAIL = 5
+DEFAULT_CHECK_TIMEOUT = 20  # total time budget for checking one ASIN
+MIN_SCAN_TIME = 60  # least time an async scan runs before cookies are read again
+WORKER_REPORT_INTERVAL = 60  # seconds between reports of the workers' check rates
+WORKER_POLL_INTERVAL = 5  # seconds between checks that the workers are still running
+SPARE_WAIT_TIMEOUT = 30  # longest a restart waits for a standby that is starting
+SPARE_COOKIE_TIMEOUT = 5  # longest a failed browser gets to hand over its cookies
+# Checkout pages are polled at a finer grain than everything else
+CHECKOUT_MAX_POLL_INTERVAL = 0.1
+
+# Containers that hold every offer we evaluate, in order of preference
+AOD_REGION_IDS = ["aod-container"]
+BUY_BOX_REGION_IDS = ["ppd", "dp-container", "dp"]
+OFFER_REGION_SCRIPT = """
+for (const id of arguments[0]) {
+    const region = document.getElementById(id);
+    if (region) {
+        return region.outerHTML;
+    }
+}
+return null;
+"""
+# Elements that mean the item can't be bought at all
+UNAVAILABLE_IDS = ["outOfStock", "backInStock"]
+# The all offers flyout is filled in from the response of this AJAX endpoint
+AOD_AJAX_URL_PATTERN = r"/gp/aod/ajax|experienceId=aodAjaxMain"
+# Opens the all offers flyout, unless the item can't be bought at all
+OPEN_OFFERS_SCRIPT = """
+for (const id of arguments[0]) {
+    if (document.getElementById(id)) {
+        return "unavailable";
+    }
+}
+const link = document.querySelector("span[data-action='show-all-offers-display'] a");
+if (link) {
+    link.click();
+    return "opened";
+}
+return null;
+"""
+# Fetches offer listings from inside the page, so that the requests carry the session's
+# cookies, and hands back the status and HTML of each
+FETCH_OFFERS_SCRIPT = """
+const [urls, timeoutMs, done] = arguments;
+const controller = new AbortController();
+const timer = setTimeout(() => controller.abort(), timeoutMs);
+Promise.all(
+    urls.map((url) =>
+        // A sign-in or captcha redirect would otherwise come back as a 200 without offers
+        fetch(url, { credentials: "include", redirect: "manual", signal: controller.signal })
+            .then((response) =>
+                response.type === "opaqueredirect"
+                    ? { status: 0, error: "redirected" }
+                    : response.text().then((html) => ({ status: response.status, html: html }))
+            )
+            .catch((error) => ({ status: 0, error: String(error) }))
+    )
+).then((results) => {
+    clearTimeout(timer);
+    done(results);
+});
+"""
+# Resolves once the offer region has rendered, an unavailable marker shows up or the
+# timeout passes.  Opens the all offers flyout if the product page links to it.
+MARK_STALE_SCRIPT = "window.fairgameStale = true;"
+PAGE_COMMITTED_SCRIPT = "return !window.fairgameStale;"
+
+OFFER_RENDER_SCRIPT = """
+const [aodIds, buyBoxIds, unavailableIds, timeoutMs, done] = arguments;
+const PRICE = ".a-price .a-offscreen";
+let finished = false;
+
+function findRegion(ids) {
+    for (const id of ids) {
+        const region = document.getElementById(id);
+        if (region) {
+            return region;
+        }
+    }
+    return null;
+}
+
+function rendered() {
+    // Set on a page that is being navigated away from
+    if (window.fairgameStale) {
+        return null;
+    }
+    if (findRegion(unavailableIds)) {
+        return {state: "unavailable"};
+    }
+    const aod = findRegion(aodIds);
+    if (aod) {
+        const offers = aod.querySelectorAll("#aod-pinned-offer, #aod-offer");
+        if (!offers.length) {
+            return null;
+        }
+        for (const offer of offers) {
+            if (offer.querySelector("input[name='submit.addToCart']")
+                    && !offer.querySelector(PRICE)) {
+                return null;
+            }
+        }
+        return {state: "offers", buyBox: false, html: aod.outerHTML};
+    }
+    const offersLink = document.querySelector(
+        "span[data-action='show-all-offers-display'] a"
+    );
+    if (offersLink) {
+        // Kept on the window, so that reading a tab repeatedly clicks the link once
+        if (!window.fairgameOffersClicked) {
+            window.fairgameOffersClicked = true;
+            offersLink.click();
+        }
+        return null;
+    }
+    if (document.querySelector("input[name='submit.add-to-cart']")) {
+        const region = findRegion(buyBoxIds);
+        if (region && region.querySelector(PRICE)) {
+            return {state: "offers", buyBox: true, html: region.outerHTML};
+        }
+    }
+    return null;
+}
+
+const observer = new MutationObserver(check);
+const timer = setTimeout(() => finish({state: "timeout"}), timeoutMs);
+
+function finish(result) {
+    if (!finished) {
+        finished = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        done(result);
+    }
+}
+
+function check() {
+    const result = rendered();
+    if (result) {
+        finish(result);
+    }
+}
+
+observer.observe(document, {childList: true, subtree: true});
+check();
+"""
+# Markup that changes on every render without saying anything about the offers
+VOLATILE_MARKUP_RE = re.compile(
+    r' data-csa-c-(?:content-)?id="[^"]*"|name="anti-csrftoken-a2z" value="[^"]*"'
+)
+OFFER_ID_RE = re.compile(
+    r'oid(?:&quot;|")\s*:\s*(?:&quot;|")([^&"]+)|"offerListingID" value="([^"]+)"'
+)
+
+# Title lists navigate_pages dispatches on, in the order they take precedence
+PAGE_TITLE_KEYS = [
+    "SIGN_IN_TITLES",
+    "CAPTCHA_PAGE_TITLES",
+    "SHOPPING_CART_TITLES",
+    "CHECKOUT_TITLES",
+    "ORDER_COMPLETE_TITLES",
+    "PRIME_TITLES",
+    "HOME_PAGE_TITLES",
+    "DOGGO_TITLES",
+    "OUT_OF_STOCK",
+    "BUSINESS_PO_TITLES",
+    "ADDRESS_SELECT",
+]
+# Elements that identify a page whose title is blank or unknown
+PAGE_SIGNATURES = [
+    ("SIGN_IN_TITLES", "#ap_email, #ap_password"),
+    ("CAPTCHA_PAGE_TITLES", "form[action*='validateCaptcha']"),
+    ("SHOPPING_CART_TITLES", "#sc-active-cart, #activeCartViewForm"),
+    ("CHECKOUT_TITLES", "#submitOrderButtonId, input[name='placeYourOrder1']"),
+]
+PAGE_SIGNATURE_SCRIPT = """
+const selectors = arguments[0];
+for (let i = 0; i < selectors.length; i++) {
+    if (document.querySelector(selectors[i])) {
+        return i;
+    }
+}
+return -1;
+"""
+
+# Evaluates a set of named XPaths in the page and reports on the first match of each,
+# together with the title, so a handler can act on one snapshot of the page
+PAGE_STATE_SCRIPT = """
+const state = {title: document.title, elements: {}};
+for (const [name, alternatives] of Object.entries(arguments[0])) {
+    for (let i = 0; i < alternatives.length; i++) {
+        const element = document.evaluate(
+            alternatives[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+        if (element) {
+            const style = window.getComputedStyle(element);
+            state.elements[name] = {
+                element: element,
+                enabled: !element.disabled,
+                displayed: style.visibility !== "hidden" && style.display !== "none"
+                    && element.getClientRects().length > 0,
+                text: element.textContent.trim(),
+                index: i,
+            };
+            break;
+        }
+    }
+}
+return state;
+"""
+# Returns the first element matched by a list of alternative XPaths, tried in order, and
+# the index of the alternative that matched it
+FIRST_MATCH_SCRIPT = """
+const alternatives = arguments[0];
+for (let i = 0; i < alternatives.length; i++) {
+    const element = document.evaluate(
+        alternatives[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    if (element) {
+        return [element, i];
+    }
+}
+return null;
+"""
+ORDER_SUCCESS_XPATH = '//*[@class="a-box a-alert a-alert-success"]'
+ACCOUNT_LINK_XPATH = '//*[@id="nav-link-accountList" or @id="ge-hello"]'
+LOGIN_FIELD_XPATH = '//*[@id="ap_email" or @id="ap_password"]'
+PASSWORD_PAGE_XPATH = '//*[@id="ap_password" or @name="rememberMe"]'
+CAPTCHA_IMAGE_XPATH = '//form[contains(@action,"validateCaptcha")]//img'
+# longest we wait for an unrecognised page to show something we know how to handle
+UNKNOWN_PAGE_DELAY = 3
+
+
+class RenderedOffers(NamedTuple):
+    state: str
+    buy_box: bool
+    html: Optional[str]
+
+
+class ProbedElement(NamedTuple):
+    element: WebElement
+    enabled: bool
+    displayed: bool
+    text: str
+    expression: str
+
+
+class PageState(NamedTuple):
+    title: str
+    elements: dict
+
+    def get(self, name) -> Optional[ProbedElement]:
+        return self.elements.get(name)
+
+    def clickable(self, name) -> Optional[WebElement]:
+        probed = self.elements.get(name)
+        if probed and probed.enabled and probed.displayed:
+            return probed.element
+        return None
+
+    @property
+    def cart_count(self):
+        # Mirrors get_cart_count: negative if the cart number can't be read
+        probed = self.elements.get("CART")
+        if probed is None:
+            return -1
+        try:
+            return int(probed.text)
+        except ValueError:
+            log.debug(f"Error converting cart number '{probed.text}' to integer")
+            return -1
+
 
 amazon_config = {}
+xpaths = XPathRegistry()
+price_parser = PriceParser()
+selector_stats = SelectorStats()
+page_classifier = PageClassifier()
+free_shipping_phrases = frozenset()
+sign_in_text_re = None
 
 
 class Amazon:
@@ -114,6 +424,21 @@ class Amazon:
         alt_offers=False,
         wait_on_captcha_fail=False,
         alt_checkout=False,
+        snapshot_offers=False,
+        check_timeout=DEFAULT_CHECK_TIMEOUT,
+        devtools_probes=False,
+        capture_offers=False,
+        fetch_offers=False,
+        fetch_batch=1,
+        block_requests=False,
+        report_transfer=False,
+        http_offers=False,
+        async_offers=False,
+        rps=DEFAULT_RATE,
+        concurrency=DEFAULT_CONCURRENCY,
+        tabs=1,
+        workers=0,
+        hot_spare=False,
     ):
         self.notification_handler = notification_handler
         self.asin_list = []
@@ -133,6 +458,7 @@ class Amazon:
         self.start_time_check = 0
         self.start_time_atc = 0
         self.end_time_atc = 0
+        self.checkout_latencies = []
         self.webdriver_child_pids = []
         self.driver = None
         self.refresh_delay = DEFAULT_REFRESH_DELAY
@@ -147,6 +473,65 @@ class Amazon:
         self.alt_offers = alt_offers
         self.wait_on_captcha_fail = wait_on_captcha_fail
         self.alt_checkout = alt_checkout
+        # Captured offer listings are parsed the same way as snapshots of the offer region
+        self.snapshot_offers = snapshot_offers or capture_offers
+        self.capture_offers = capture_offers
+        # Listings fetched over plain HTTP are used the same way as ones fetched in-page
+        self.fetch_offers = fetch_offers or http_offers
+        self.http_offers = http_offers
+        # Shares the browser's cookies, created once the browser is logged in
+        self.http_session = None
+        self.async_offers = async_offers
+        self.rps = rps
+        self.concurrency = concurrency
+        # Where in the round robin of ASINs the next async scan starts
+        self.scan_position = 0
+        # Offer pages load side by side in this many tabs of the one browser
+        self.tabs = max(1, tabs)
+        self.tab_handles = []
+        # Stock check workers with browsers of their own; this instance checks out
+        self.worker_count = max(0, workers)
+        self.workers = []
+        self.workers_stopped = threading.Event()
+        # (asin, ranked offers, worker number) found by the workers
+        self.found_offers = queue.Queue()
+        # Guards asin_list and the reserves, which the workers read
+        self.asin_lock = threading.Lock()
+        # A standby browser, logged in through this one's cookies, to switch to when
+        # this one fails
+        self.hot_spare = hot_spare
+        self.spare_driver = None
+        self.spare_pids = []
+        self.spare_thread = None
+        # The cookies the standby was seeded with, for when the failed browser is gone
+        self.spare_cookies = []
+        self.fetch_batch = max(1, fetch_batch)
+        # Offer listing HTML fetched ahead of the stock check, by ASIN
+        self.fetched_listings = {}
+        self.block_requests = block_requests
+        # URL patterns kept from loading while checking stock, lifted for checkout
+        self.blocked_urls = []
+        self.request_blocking = False
+        self.report_transfer = report_transfer
+        # Bytes transferred by each stock check
+        self.check_transfers = []
+        self.check_timeout = check_timeout
+        # Number of checks per ASIN that ran out of their time budget
+        self.check_overruns = Counter()
+        # Fingerprint of the offer region behind each ASIN's last negative verdict
+        self.offer_fingerprints = {}
+        # Bumped whenever the document may have been replaced; page_cache entries are
+        # only valid for the generation they were stored under
+        self.page_generation = 0
+        self.page_cache = {}
+        self.page_events = PageEvents()
+        if capture_offers:
+            self.page_events.capture(AOD_AJAX_URL_PATTERN)
+        # Read-only probes skip chromedriver and go to the browser directly when enabled
+        self.devtools_probes = devtools_probes
+        self.devtools = DevToolsChannel()
+        # Kills the browser when a WebDriver command hangs, so that the command returns
+        self.watchdog = Watchdog(on_hang=self.kill_browser)
 
         presence.enabled = not disable_presence
 
@@ -154,7 +539,14 @@ class Amazon:
         from cli.cli import global_config
 
         amazon_config = global_config.get_amazon_config(encryption_pass)
+        xpaths.load(amazon_config["XPATHS"])
+        xpaths.register("PLACE_ORDER", BUTTON_XPATHS)
+        load_free_shipping_phrases(amazon_config["FREE_SHIPPING"])
+        load_sign_in_text(amazon_config["SIGN_IN_TEXT"])
+        if block_requests:
+            self.blocked_urls = amazon_config.get("STOCK_CHECK_BLOCKED_URLS", [])
         self.profile_path = global_config.get_browser_profile_path()
+        self.spare_profile_path = f"{self.profile_path}-spare"
 
         try:
             presence.start_presence()
@@ -183,6 +575,11 @@ class Amazon:
                     self.amazon_website = config.get(
                         "amazon_website", "smile.amazon.com"
                     )
+                    price_parser.set_locale(self.amazon_website)
+                    page_classifier.load(
+                        amazon_config, PAGE_TITLE_KEYS, self.amazon_website
+                    )
+                    selector_stats.load(SELECTOR_STATS_FILE, self.amazon_website)
                     for x in range(self.asin_groups):
                         if float(config[f"reserve_min_{x + 1}"]) > float(
                             config[f"reserve_max_{x + 1}"]
@@ -230,6 +627,8 @@ class Amazon:
             try:
                 self.get_page(url=AMAZON_URLS["BASE_URL"])
                 break
+            except DriverHungException as e:
+                self.recover_hung_driver(e)
             except sel_exceptions.WebDriverException:
                 log.error(
                     "Couldn't talk to "
@@ -261,19 +660,32 @@ class Amazon:
             time.sleep(30)
             return
 
+        if self.hot_spare:
+            self.start_spare()
+
         continue_stock_check = True
 
         log.info("Checking stock for items.")
 
         while continue_stock_check:
             self.unknown_title_notification_sent = False
-            asin = self.run_asins(delay)
+            if self.async_offers:
+                asin = self.run_asins_async()
+            elif self.worker_count:
+                asin = self.run_asins_workers(delay)
+            elif self.tabs > 1 and not self.slow_mode:
+                asin = self.run_asins_tabs(delay)
+            else:
+                asin = self.run_asins(delay)
             # New normal (buy it now)
             if not self.alt_checkout:
                 self.remove_asin_list(asin)
                 if not self.asin_list or self.single_shot:
                     continue_stock_check = False
-                self.navigate_pages(test)
+                try:
+                    self.navigate_pages(test)
+                except DriverHungException as e:
+                    self.recover_hung_driver(e)
 
             else:
                 # found something in stock and under reserve
@@ -289,6 +701,9 @@ class Amazon:
                     # if for some reason page transitions in the middle of checking elements, don't break the program
                     except sel_exceptions.StaleElementReferenceException:
                         pass
+                    except DriverHungException as e:
+                        self.recover_hung_driver(e)
+                        self.try_to_checkout = False
                     # if successful after running navigate pages, remove the asin_list from the list
                     if (
                         not self.try_to_checkout
@@ -310,6 +725,8 @@ class Amazon:
                 # if no items left it list, let loop end
                 if not self.asin_list:
                     continue_stock_check = False
+        self.stop_workers()
+        self.delete_spare()
         runtime = time.time() - self.start_time
         log.info(f"FairGame bot ran for {runtime} seconds.")
         time.sleep(10)  # add a delay to shut stuff done
@@ -326,7 +743,12 @@ class Amazon:
 
     @debug
     def handle_startup(self):
-        time.sleep(self.page_wait_delay())
+        # The account link is what tells us whether we are logged in, so wait for it
+        # rather than for a fixed delay
+        wait_until(
+            lambda: self.driver.find_elements(By.XPATH, ACCOUNT_LINK_XPATH),
+            timeout=self.page_wait_delay(),
+        )
         if self.is_logged_in():
             log.info("Already logged in")
         else:
@@ -344,13 +766,17 @@ class Amazon:
             except sel_exceptions.NoSuchElementException:
                 log.error("Log in button does not exist")
             log.info("Wait for Sign In page")
-            time.sleep(self.page_wait_delay())
+            wait_until(
+                lambda: self.driver.find_elements(By.XPATH, LOGIN_FIELD_XPATH),
+                timeout=self.page_wait_delay(),
+            )
+            self.page_changed()
 
     @debug
     def is_logged_in(self):
         try:
             text = self.driver.find_element(By.ID,"nav-link-accountList").text
-            return not any(sign_in in text for sign_in in amazon_config["SIGN_IN_TEXT"])
+            return not sign_in_text_re.search(text)
         except sel_exceptions.NoSuchElementException:
 
             return False
@@ -360,21 +786,28 @@ class Amazon:
         log.info("Email")
         email_field = None
         password_field = None
-        timeout = self.get_timeout()
-        while True:
+
+        def find_login_field():
             try:
-                email_field = self.driver.find_element(By.XPATH,'//*[@id="ap_email"]')
-                break
+                return "email", self.driver.find_element(
+                    By.XPATH, '//*[@id="ap_email"]'
+                )
             except sel_exceptions.NoSuchElementException:
-                try:
-                    password_field = self.driver.find_element(By.XPATH,
-                        '//*[@id="ap_password"]'
-                    )
-                    break
-                except sel_exceptions.NoSuchElementException:
-                    pass
-            if time.time() > timeout:
-                break
+                return "password", self.driver.find_element(
+                    By.XPATH, '//*[@id="ap_password"]'
+                )
+
+        found = wait_until(
+            find_login_field,
+            ignored_exceptions=(sel_exceptions.NoSuchElementException,),
+            timeout=DEFAULT_MAX_TIMEOUT,
+        )
+        if found:
+            field_name, field = found
+            if field_name == "email":
+                email_field = field
+            else:
+                password_field = field
 
         if email_field:
             try:
@@ -404,7 +837,10 @@ class Amazon:
             time.sleep(240)
             exit(1)
 
-        time.sleep(self.page_wait_delay())
+        wait_until(
+            lambda: self.driver.find_elements(By.XPATH, PASSWORD_PAGE_XPATH),
+            timeout=self.page_wait_delay(),
+        )
 
         log.info("Remember me checkbox")
         try:
@@ -413,19 +849,12 @@ class Amazon:
             log.error("Remember me checkbox did not exist")
 
         log.info("Password")
-        password_field = None
-        timeout = self.get_timeout()
         current_page = self.driver.title
-        while True:
-            try:
-                password_field = self.driver.find_element(By.XPATH,
-                    '//*[@id="ap_password"]'
-                )
-                break
-            except sel_exceptions.NoSuchElementException:
-                pass
-            if time.time() > timeout:
-                break
+        password_field = wait_until(
+            lambda: self.driver.find_element(By.XPATH, '//*[@id="ap_password"]'),
+            ignored_exceptions=(sel_exceptions.NoSuchElementException,),
+            timeout=DEFAULT_MAX_TIMEOUT,
+        )
 
         captcha_entry = []
         if password_field:
@@ -448,86 +877,459 @@ class Amazon:
             while self.driver.title in amazon_config["TWOFA_TITLES"]:
                 # Wait for the user to enter 2FA
                 time.sleep(2)
+        self.page_changed()
         log.info(f'Logged in as {amazon_config["username"]}')
 
     @debug
     def run_asins(self, delay):
         found_asin = False
+        self.fetched_listings = {}
         while not found_asin:
             for i in range(len(self.asin_list)):
-                for asin in self.asin_list[i]:
+                for j, asin in enumerate(self.asin_list[i]):
                     self.start_time_check = time.time()
                     if self.log_stock_check:
                         log.info(f"Checking ASIN: {asin}.")
+                    deadline = Deadline(self.check_timeout)
+                    transferred = self.page_events.transferred
+                    blocked = self.page_events.blocked
+                    try:
+                        if self.fetch_offers and asin not in self.fetched_listings:
+                            self.fetch_offer_listings(
+                                self.asin_list[i][j : j + self.fetch_batch], deadline
+                            )
+                        if self.check_stock(
+                            asin,
+                            self.reserve_min[i],
+                            self.reserve_max[i],
+                            deadline=deadline,
+                        ):
+                            return asin
+                    except DriverHungException as e:
+                        self.fetched_listings = {}
+                        self.recover_hung_driver(e)
+                        continue
+                    if deadline.expired():
+                        self.check_overruns[asin] += 1
+                        log.warning(
+                            f"Check of {asin} ran out of its {self.check_timeout} second budget "
+                            f"({self.check_overruns[asin]} times so far)"
+                        )
+                    if self.report_transfer:
+                        self.report_check_transfer(asin, transferred, blocked)
+                    # log.info(f"check time took {time.time()-start_time} seconds")
+                    # Listings fetched together are checked back to back, while still fresh
+                    if not self.fetched_listings:
+                        time.sleep(delay)
+
+    def run_asins_tabs(self, delay):
+        """Keeps a pool of tabs loading offer pages.  Navigation doesn't block under the
+        "none" page load strategy, so every tab has a page on the way while the others
+        are read, and each is harvested as soon as its offers render.  The tab that finds
+        stock is left in front for checkout."""
+        keys = [(asin, i) for i, asins in enumerate(self.asin_list) for asin in asins]
+        rotation = itertools.cycle(keys)
+        size = min(self.tabs, len(keys))
+        fail_counter = 0
+        handles = []
+        # Tab handle -> (asin, group, deadline, start time) of the page it is loading
+        loading = {}
+        # Tab handle -> monotonic time at which it may load its next page
+        idle = {}
+        while True:
+            try:
+                if not handles:
+                    handles = self.open_tabs(size)
+                    loading = {}
+                    idle = {handle: 0 for handle in handles}
+                for handle, ready_at in list(idle.items()):
+                    if ready_at > time.monotonic():
+                        continue
+                    busy = {key[:2] for key in loading.values()}
+                    asin, i = next(key for key in rotation if key not in busy)
+                    if self.log_stock_check:
+                        log.info(f"Checking ASIN: {asin}.")
+                    if not self.load_tab(handle, asin):
+                        fail_counter += 1
+                        if fail_counter >= DEFAULT_MAX_URL_FAIL:
+                            fail_counter = 0
+                            handles = []
+                            loading = {}
+                            self.restart_driver()
+                            break
+                        continue
+                    fail_counter = 0
+                    del idle[handle]
+                    deadline = Deadline(self.check_timeout)
+                    loading[handle] = (asin, i, deadline, time.time())
+                for handle, (asin, i, deadline, started) in list(loading.items()):
+                    self.switch_to_tab(handle)
+                    self.start_time_check = started
+                    verdict = self.harvest_tab(
+                        asin, self.reserve_min[i], self.reserve_max[i], deadline
+                    )
+                    if verdict is None:
+                        continue
+                    if verdict:
+                        del loading[handle]
+                        self.stop_tabs(loading, handle)
+                        if self.devtools_probes:
+                            self.devtools.connect(self.driver)
+                        return asin
+                    del loading[handle]
+                    idle[handle] = time.monotonic() + delay
+            except DriverHungException as e:
+                handles = []
+                self.recover_hung_driver(e)
+                continue
+            time.sleep(DEFAULT_POLL_INTERVAL)
+
+    def stop_tabs(self, handles, checkout_handle):
+        """Stops the pages still loading in handles, so that they don't keep the browser
+        busy during checkout, and goes back to the checkout tab"""
+        for handle in handles:
+            self.switch_to_tab(handle)
+            try:
+                self.driver.execute_script("window.stop();")
+            except sel_exceptions.WebDriverException as e:
+                log.debug(f"Failed to stop loading a tab: {e}")
+        self.switch_to_tab(checkout_handle)
+
+    def open_tabs(self, count):
+        """Tops the tab pool up to count tabs of the current browser, dropping the ones
+        whose windows have gone, and returns their handles"""
+        windows = self.driver.window_handles
+        self.tab_handles = [handle for handle in self.tab_handles if handle in windows]
+        if not self.tab_handles:
+            self.tab_handles = [self.driver.current_window_handle]
+        while len(self.tab_handles) < count:
+            windows = set(self.driver.window_handles)
+            self.driver.execute_script("window.open('about:blank');")
+            opened = set(self.driver.window_handles) - windows
+            if not opened:
+                log.warning(f"Could only open {len(self.tab_handles)} tabs")
+                break
+            handle = opened.pop()
+            self.tab_handles.append(handle)
+            if self.blocked_urls:
+                # Blocking is set up per tab
+                self.switch_to_tab(handle)
+                self.driver.execute_cdp_cmd("Network.enable", {})
+        return self.tab_handles[:count]
+
+    def switch_to_tab(self, handle):
+        self.driver.switch_to.window(handle)
+        self.page_events.follow(handle)
+        self.page_changed()
+        # The tab may be blocking or not, and the channel belongs to another tab
+        self.request_blocking = None
+        self.devtools.close()
+
+    def load_tab(self, handle, asin):
+        """Starts loading the offer page for asin in a tab, without waiting for it"""
+        self.switch_to_tab(handle)
+        self.set_request_blocking(True)
+        presence.searching_update()
+        url = furl(self.ACTIVE_OFFER_URL + asin).url
+        try:
+            # Until the new page commits, reading the tab would see the old one
+            self.driver.execute_script(MARK_STALE_SCRIPT)
+            self.driver.get(url=url)
+        except sel_exceptions.WebDriverException:
+            log.error(f"Failed to load page at url: {url}")
+            return False
+        finally:
+            self.page_changed()
+        return True
+
+    def harvest_tab(self, asin, reserve_min, reserve_max, deadline):
+        """Reads the offers in the front tab once, without waiting for them.  Returns None
+        while they are still on their way, and otherwise whether one was bought."""
+        rendered = self.wait_for_offer_render(timeout=0)
+        if rendered is None or rendered.state == "timeout":
+            if not deadline.expired():
+                return None
+            if self.driver.title in amazon_config["CAPTCHA_PAGE_TITLES"]:
+                self.handle_captcha()
+            else:
+                log.warning(f"Timed out waiting for offers of {asin} to render")
+                self.check_overruns[asin] += 1
+            return False
+        if rendered.state == "unavailable":
+            log.info(f"Item {asin} is currently unavailable.  Moving on...")
+            return False
+        return self.check_offer_snapshots(
+            asin,
+            reserve_min,
+            reserve_max,
+            rendered.buy_box,
+            region_html=rendered.html,
+            deadline=deadline,
+        )
+
+    def run_asins_workers(self, delay):
+        """Waits for the workers to find a qualifying offer and checks it out in this
+        browser.  Offers are checked out one at a time, so two workers never buy into
+        the same cart."""
+        if not self.workers:
+            self.start_workers(delay)
+        reported = time.monotonic()
+        while True:
+            if time.monotonic() - reported >= WORKER_REPORT_INTERVAL:
+                self.report_check_rates()
+                reported = time.monotonic()
+            for worker in self.workers:
+                if not worker.alive():
+                    log.error(f"Worker {worker.number + 1} stopped, starting it again")
+                    worker.start()
+            try:
+                asin, ranked, number = self.found_offers.get(
+                    timeout=WORKER_POLL_INTERVAL
+                )
+            except queue.Empty:
+                continue
+            with self.asin_lock:
+                group = next(
+                    (i for i, asins in enumerate(self.asin_list) if asin in asins),
+                    None,
+                )
+            if group is None:
+                # Found before another checkout took its group off the list
+                continue
+            log.info(f"Worker {number + 1} found stock for {asin}")
+            self.start_time_check = time.time()
+            try:
+                if self.purchase_ranked_offers(
+                    asin, ranked, self.reserve_min[group], self.reserve_max[group]
+                ):
+                    return asin
+            except DriverHungException as e:
+                self.recover_hung_driver(e)
+
+    def start_workers(self, delay):
+        # Workers can't share this browser's profile, so they take its cookies instead
+        cookies = self.driver.get_cookies()
+        self.workers_stopped.clear()
+        self.workers = [
+            StockCheckWorker(self, number, cookies, delay)
+            for number in range(self.worker_count)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def stop_workers(self):
+        if not self.workers:
+            return
+        self.workers_stopped.set()
+        for worker in self.workers:
+            worker.join()
+        self.report_check_rates()
+        self.workers = []
+
+    def report_check_rates(self):
+        total = 0
+        for worker in self.workers:
+            rate = worker.check_rate()
+            total += rate
+            log.info(
+                f"Worker {worker.number + 1}: {worker.checks} checks, "
+                f"{rate:.2f} per second"
+            )
+        log.info(f"All workers: {total:.2f} checks per second")
+
+    def run_asins_async(self):
+        """Checks all ASINs over concurrent HTTP requests, paced by one requests per second
+        budget instead of a delay per ASIN, and hands the first qualifying offer to the
+        usual checkout"""
+        while True:
+            try:
+                # Reading the cookies can find the browser hung as well
+                found = self.scan_offer_listings()
+                if found is None:
+                    # Cookies expired, go round again with fresh ones
+                    continue
+                (asin, i), result = found
+                self.start_time_check = time.time()
+                if result == "browser":
+                    # A stale session or a captcha; checking through the browser deals
+                    # with either, and the next scan picks up its cookies
                     if self.check_stock(asin, self.reserve_min[i], self.reserve_max[i]):
                         return asin
-                    # log.info(f"check time took {time.time()-start_time} seconds")
-                    time.sleep(delay)
+                elif self.purchase_ranked_offers(
+                    asin, result, self.reserve_min[i], self.reserve_max[i]
+                ):
+                    return asin
+            except DriverHungException as e:
+                self.recover_hung_driver(e)
+
+    def scan_offer_listings(self):
+        """Fetches offer listings round robin until one of them has an offer worth buying
+        or needs the browser, returning ((asin, group), ranked offers or "browser").
+        Returns None once the browser's cookies expire."""
+        cookies = self.driver.get_cookies()
+        user_agent = self.driver.execute_script("return navigator.userAgent;")
+        expiries = [cookie["expiry"] for cookie in cookies if "expiry" in cookie]
+        timeout = None
+        if expiries:
+            # Short lived cookies shouldn't keep restarting the scan
+            timeout = max(MIN_SCAN_TIME, min(expiries) - time.time())
+        keys = [(asin, i) for i, asins in enumerate(self.asin_list) for asin in asins]
+
+        def rotation():
+            # Carries on from where the last scan left off, so that an ASIN that keeps
+            # ending scans doesn't starve the ones after it
+            for position in itertools.count(self.scan_position % len(keys)):
+                self.scan_position = position + 1
+                key = keys[position % len(keys)]
+                yield key, AMAZON_URLS["AOD_URL"] + key[0]
+
+        async def run():
+            async with client_session(
+                cookies={cookie["name"]: cookie["value"] for cookie in cookies},
+                headers={"User-Agent": user_agent},
+                concurrency=self.concurrency,
+                timeout=DEFAULT_MAX_TIMEOUT,
+            ) as session:
+                return await asyncio.wait_for(
+                    scan(
+                        session,
+                        rotation(),
+                        self.evaluate_listing,
+                        RequestBudget(self.rps),
+                        self.concurrency,
+                    ),
+                    timeout,
+                )
+
+        try:
+            found = asyncio.run(run())
+        except asyncio.TimeoutError:
+            return None
+        if found is not None:
+            # Listings in flight behind the one that ended the scan were dropped with it
+            self.scan_position = keys.index(found[0]) + 1
+        return found
+
+    def evaluate_listing(self, key, status, listing):
+        asin, i = key
+        if self.log_stock_check:
+            log.info(f"Checked ASIN: {asin} ({status}).")
+        if status in (301, 302, 303, 307) or (
+            status == 200 and "validateCaptcha" in listing
+        ):
+            return "browser"
+        if status != 200:
+            log.debug(f"Fetching offers for {asin} failed ({status}): {listing[:200]}")
+            return None
+        return self.rank_listing(
+            asin, listing, self.reserve_min[i], self.reserve_max[i]
+        )
+
+    def rank_listing(self, asin, listing, reserve_min, reserve_max, buy_box=False):
+        """Ranks the offers of a fetched listing that are in the reserve window, skipping
+        listings that haven't changed since they last had none"""
+        fingerprint = offer_region_fingerprint(listing, reserve_min, reserve_max)
+        if self.offer_fingerprints.get(asin) == fingerprint:
+            return []
+        ranked = rank_offers(
+            offers_in_reserve(
+                parse_offer_snapshots(listing, buy_box=buy_box),
+                reserve_min,
+                reserve_max,
+                free_shipping_only=not self.checkshipping,
+            ),
+            self.condition,
+        )
+        if ranked:
+            self.offer_fingerprints.pop(asin, None)
+        else:
+            self.offer_fingerprints[asin] = fingerprint
+        return ranked
 
     @debug
-    def check_stock(self, asin, reserve_min, reserve_max, retry=0):
+    def check_stock(self, asin, reserve_min, reserve_max, retry=0, deadline=None):
+        """Checks the offers for asin, buying the best one in the reserve window.  Every
+        wait on the way to a verdict is cut short by deadline, which defaults to a fresh
+        budget of check_timeout seconds."""
+        if deadline is None:
+            deadline = Deadline(self.check_timeout)
         if retry > DEFAULT_MAX_ATC_TRIES:
             log.info("max add to cart retries hit, returning to asin check")
             return False
+        self.set_request_blocking(True)
+        listing = self.fetched_listings.pop(asin, None)
+        if listing is not None:
+            # Only a qualifying offer needs the browser to go anywhere
+            return self.check_offer_snapshots(
+                asin, reserve_min, reserve_max, region_html=listing, deadline=deadline
+            )
         # load page
         f = furl(self.ACTIVE_OFFER_URL + asin)
         fail_counter = 0
         presence.searching_update()
 
+        since = self.page_events.mark()
         # handles initial page load only
         while True:
             try:
-                self.get_page(f.url)
-                log.debug(f"Initial page title {self.driver.title}")
+                self.get_page(f.url, timeout=deadline.cap(DEFAULT_MAX_TIMEOUT))
+                title = self.page_title()
+                log.debug(f"Initial page title {title}")
                 log.debug(f"        page url: {self.driver.current_url}")
-                if self.driver.title in amazon_config["CAPTCHA_PAGE_TITLES"]:
+                if title in amazon_config["CAPTCHA_PAGE_TITLES"]:
                     self.handle_captcha()
                 break
+            except DriverHungException:
+                raise
             except Exception:
                 fail_counter += 1
                 log.error(f"Failed to load the offer URL {fail_counter} times.")
+                if deadline.expired():
+                    log.warning(f"Out of time loading the page for {asin}")
+                    return False
                 if fail_counter < DEFAULT_MAX_URL_FAIL:
                     log.error(
                         f"WebDriver will restart if it fails {DEFAULT_MAX_URL_FAIL} times. Retrying now..."
                     )
-                    time.sleep(3)
+                    time.sleep(deadline.cap(3))
                 else:
-                    log.info(
-                        "Attempting to delete and recreate current chrome instance"
-                    )
-                    if not self.delete_driver():
-                        log.error("Failed to delete chrome processes")
-                        log.error("Please restart bot")
-                        self.send_notification(
-                            message="Bot Failed, please restart bot",
-                            page_name="Bot Failed",
-                            take_screenshot=False,
-                        )
-                        raise RuntimeError("Failed to restart bot")
-                    elif not self.create_driver(self.profile_path):
-                        log.error("Failed to recreate webdriver processes")
-                        log.error("Please restart bot")
-                        self.send_notification(
-                            message="Bot Failed, please restart bot",
-                            page_name="Bot Failed",
-                            take_screenshot=False,
-                        )
-                        raise RuntimeError("Failed to restart bot")
-                    else:  # deleted driver and recreated it succesfully
-                        log.info(
-                            "WebDriver recreated successfully. Returning back to stock check"
-                        )
-                        return False
+                    self.restart_driver()
+                    return False
 
-        timeout = self.get_timeout()
+        rendered = None
+        if self.capture_offers and self.page_events.enabled:
+            rendered = self.capture_offer_listing(since, deadline)
+        if rendered is None:
+            rendered = self.wait_for_offer_render(
+                timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)
+            )
+        if rendered:
+            if rendered.state == "unavailable":
+                log.info("Item is currently unavailable.  Moving on...")
+                return False
+            if rendered.state == "timeout":
+                log.warning("Timed out waiting for offers to render.  Skipping...")
+                log.warning(f"URL: {self.driver.current_url}")
+                return False
+            if self.snapshot_offers:
+                return self.check_offer_snapshots(
+                    asin,
+                    reserve_min,
+                    reserve_max,
+                    rendered.buy_box,
+                    region_html=rendered.html,
+                    deadline=deadline,
+                )
+        # Polling takes over when the observer couldn't run, and finds everything on its
+        # first pass when the observer saw the offers render
         atc_buttons = None
-        while True:
+        for _ in poll(timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)):
             buy_box = False
             # Sanity check to see if we have any offers
             try:
                 # Wait for the page to load before determining what's in it by looking for the footer
                 offer_container = WebDriverWait(
-                    self.driver, timeout=DEFAULT_MAX_TIMEOUT
+                    self.driver, timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)
                 ).until(
                     lambda d: d.find_element(By.XPATH,
                         "//div[@id='aod-container'] | "
@@ -575,7 +1377,9 @@ class Amazon:
                         log.debug(
                             "Found a loading flyout div.  Waiting for offers to load..."
                         )
-                        WebDriverWait(self.driver, timeout=DEFAULT_MAX_TIMEOUT).until(
+                        WebDriverWait(
+                            self.driver, timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)
+                        ).until(
                             lambda d: d.find_element(By.XPATH,
                                 "//div[@id='aod-container']  "
                             )
@@ -599,7 +1403,7 @@ class Amazon:
                             # Now wait for the flyout to load
                             log.debug("Waiting for flyout...")
                             WebDriverWait(
-                                self.driver, timeout=DEFAULT_MAX_TIMEOUT
+                                self.driver, timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)
                             ).until(
                                 lambda d: d.find_element(By.XPATH,
                                     "//div[@id='aod-container']"
@@ -658,6 +1462,10 @@ class Amazon:
                     "Covering element detected... Assuming it's a slow flyout... scanning document again..."
                 )
                 continue
+            if self.snapshot_offers:
+                return self.check_offer_snapshots(
+                    asin, reserve_min, reserve_max, buy_box, deadline=deadline
+                )
             if buy_box:
                 atc_buttons = self.get_amazon_elements(key="ATC_BUY_BOX")
             else:
@@ -676,12 +1484,11 @@ class Amazon:
 
             if test and (test.text in amazon_config["NO_SELLERS"]):
                 return False
-            if time.time() > timeout:
-                log.warning(f"Failed to load page for {asin}, going to next ASIN")
-                return False
+        else:
+            log.warning(f"Failed to load page for {asin}, going to next ASIN")
+            return False
 
-        timeout = self.get_timeout()
-        while True:
+        for _ in poll(timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)):
             if buy_box:
                 # prices = self.driver.find_elements(By.XPATH,
                 #     "//span[@id='price_inside_buybox']"
@@ -697,14 +1504,13 @@ class Amazon:
                 )
             if prices:
                 break
-            if time.time() > timeout:
-                log.warning(f"failed to load prices for {asin}, going to next ASIN")
-                return False
+        else:
+            log.warning(f"failed to load prices for {asin}, going to next ASIN")
+            return False
         shipping = []
         shipping_prices = []
 
-        timeout = self.get_timeout()
-        while True:
+        for _ in poll(timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)):
             # Check for offers"
             if buy_box:
                 offer_xpath = "//form[@id='addToCart']"
@@ -719,197 +1525,432 @@ class Amazon:
                 shipping_prices.append(get_shipping_costs(tree))
             if shipping_prices:
                 break
+        else:
+            log.warning(f"failed to load shipping for {asin}, going to next ASIN")
+            return False
 
-            if time.time() > timeout:
-                log.warning(f"failed to load shipping for {asin}, going to next ASIN")
-                return False
-
-        in_stock = False
-
+        offers = []
         for idx, atc_button in enumerate(atc_buttons):
-            # If the user has specified that they only want free items, we can skip any items
-            # that have any shipping cost and early out
-            if not self.checkshipping and shipping_prices[idx].amount_float > 0.00:
-                continue
+            try:
+                price = price_parser.parse(prices[idx].get_attribute("innerHTML"))
+                ship_price = shipping_prices[idx] or FREE_SHIPPING_PRICE
+            except IndexError:
+                log.debug("Price index error")
+                break
+            offers.append(
+                OfferSnapshot(
+                    price=price,
+                    shipping=ship_price,
+                    condition=None,
+                    offering_id=None,
+                    seller=None,
+                )
+            )
 
-            # Condition check first, using the button to find the form that will divulge the item's condition
-            # with the assumption that anything in the Buy Box on the PDP *must* be New and therefor will clear
-            # any condition hurdle.
+        # Condition and offering ID cost extra round trips, so only look them up for offers
+        # that are already inside the reserve window
+        qualifying = []
+        for idx, offer in offers_in_reserve(
+            offers, reserve_min, reserve_max, free_shipping_only=not self.checkshipping
+        ):
+            atc_button = atc_buttons[idx]
+            # Anything in the Buy Box on the PDP *must* be New and therefor will clear any
+            # condition hurdle.
+            condition = AmazonItemCondition.New if buy_box else None
             if not buy_box:
-                condition: List[WebElement] = atc_button.find_elements(
+                condition_forms: List[WebElement] = atc_button.find_elements(
                     By.XPATH, "./following::form[@method='get']"
                 )
-                if condition:
-                    atc_form_action = condition[0].get_attribute("action")
-                    seller_item_condition = get_item_condition(atc_form_action)
-                    # Lower condition value imply newer
-                    if seller_item_condition.value > self.condition.value:
-                        # Item is below our standards, so skip it
-                        log.debug(
-                            f"Skipping item because its condition is below the requested level: "
-                            f"{seller_item_condition} is below {self.condition}"
-                        )
-                        continue
-
-            try:
-                price = parse_price(
-                    re.sub(
-                        r"(?:\s+|(?:&nbsp;)+)",
-                        "",
-                        prices[idx].get_attribute("innerHTML").strip(),
+                if condition_forms:
+                    condition = get_item_condition(
+                        condition_forms[0].get_attribute("action")
                     )
+            try:
+                atc_action: List[WebElement] = atc_button.find_elements(
+                    By.XPATH, "./ancestor::span[@data-action='aod-atc-action']"
                 )
-            except IndexError:
-                log.debug("Price index error")
-                return False
-            # Include the price, even if it's zero for comparison
-            ship_price = shipping_prices[idx]
-            ship_float = ship_price.amount
-            price_float = price.amount
-            if price_float is None:
-                return False
-            if ship_float is None:
-                ship_float = 0
-
-            if (
-                (ship_float + price_float) <= reserve_max
-                or math.isclose((price_float + ship_float), reserve_max, abs_tol=0.01)
-            ) and (
-                (ship_float + price_float) >= reserve_min
-                or math.isclose((price_float + ship_float), reserve_min, abs_tol=0.01)
-            ):
-                log.info(
-                    f"Item {asin} in stock and in reserve range: {price_float} + {ship_float} shipping <= {reserve_max}"
+                full_atc_action_string = atc_action[0].get_attribute(
+                    "data-aod-atc-action"
                 )
-                log.info("Adding to cart")
-                # Get the offering ID
-                try:
-                    atc_action: List[WebElement] = atc_button.find_elements(
-                        By.XPATH, "./ancestor::span[@data-action='aod-atc-action']"
-                    )
-                    full_atc_action_string = atc_action[0].get_attribute(
-                        "data-aod-atc-action"
-                    )
-                    offering_id = json.loads(full_atc_action_string)["oid"]
-                except:
-                    log.error("Unable to find OfferID...")
-                    return False
-
-                if offering_id:
-                    log.info("Attempting Add To Cart with offer ID...")
-                    if not self.alt_checkout:
-                        if self.buy_it_now(offering_id, max_atc_retries=20):
-                            return True
-                        else:
-                            self.send_notification(
-                                "Failed Buy it Now ",
-                                "failed-BIN",
-                                self.take_screenshots,
-                            )
-                            self.save_page_source("failed-atc")
-                            return False
-                    else:
-                        if self.attempt_atc(offering_id, asin):
-                            return True
-                        else:
-                            self.send_notification(
-                                "Failed ATC ",
-                                "failed-ATC",
-                                self.take_screenshots,
-                            )
-                            self.save_page_source("failed-atc")
-                            return False
-                else:
-                    log.error(
-                        "Unable to find offering ID to add to cart.  Using legacy mode."
-                    )
-                    self.notification_handler.play_notify_sound()
-                    if self.detailed:
-                        self.send_notification(
-                            message=f"Found Stock ASIN:{asin}",
-                            page_name="Stock Alert",
-                            take_screenshot=self.take_screenshots,
-                        )
+                offering_id = json.loads(full_atc_action_string)["oid"]
+            except:
+                log.error("Unable to find OfferID...")
+                continue
+            qualifying.append(
+                (idx, offer._replace(condition=condition, offering_id=offering_id))
+            )
 
-                    presence.buy_update()
-                    current_title = self.driver.title
-                    # log.info(f"current page title is {current_title}")
-                    try:
-                        atc_button.click()
-                    except IndexError:
-                        log.debug("Index Error")
-                        return False
-                    self.wait_for_page_change(current_title)
-                    # log.info(f"page title is {self.driver.title}")
-                    emtpy_cart_elements = self.driver.find_elements(
-                        By.XPATH,
-                        "//div[contains(@class, 'sc-your-amazon-cart-is-empty') or contains(@class, 'sc-empty-cart')]",
-                    )
+        ranked = rank_offers(qualifying, self.condition)
+        if not ranked:
+            log.info(f"Offers exceed price range ({reserve_min:.2f}-{reserve_max:.2f})")
+            return False
+        return self.purchase_ranked_offers(
+            asin, ranked, reserve_min, reserve_max, atc_buttons, retry
+        )
 
-                    if (
-                        not emtpy_cart_elements
-                        and self.driver.title in amazon_config["SHOPPING_CART_TITLES"]
-                    ):
-                        return True
-                    else:
-                        log.warning("Did not add to cart, trying again")
-                        if emtpy_cart_elements:
-                            log.info(
-                                "Cart appeared empty after clicking Add To Cart button"
-                            )
-                        log.debug(f"failed title was {self.driver.title}")
-                        self.send_notification(
-                            "Failed Add to Cart", "failed-atc", self.take_screenshots
-                        )
-                        self.save_page_source("failed-atc")
-                        in_stock = self.check_stock(
-                            asin=asin,
-                            reserve_max=reserve_max,
-                            reserve_min=reserve_min,
-                            retry=retry + 1,
-                        )
-            elif reserve_min > (price_float + ship_float):
-                log.debug(
-                    f"  Min ({reserve_min}) > Price ({price_float} + {ship_float} shipping)"
+    def purchase_ranked_offers(
+        self, asin, ranked, reserve_min, reserve_max, atc_buttons=None, retry=0
+    ):
+        """Works down the ranked offers, moving straight on to the next one when checkout
+        fails.  The offer IDs are already in hand, so the offer page need not reload."""
+        self.set_request_blocking(False)
+        for position, (idx, offer) in enumerate(ranked):
+            last_offer = position == len(ranked) - 1
+            log.info(
+                f"Item {asin} in stock and in reserve range: {offer.price.amount} + "
+                f"{offer.shipping.amount or 0} shipping <= {reserve_max}"
+            )
+            if offer.offering_id:
+                log.info(f"Adding to cart (seller: {offer.seller})")
+                if self.purchase_offer(
+                    offer.offering_id,
+                    asin,
+                    # Save the long retry budget for the last offer standing
+                    max_atc_retries=20 if last_offer else DEFAULT_MAX_ATC_TRIES,
+                    # Capturing the failure only once there is nothing left to try
+                    # keeps the fallback to the next offer quick
+                    report_failure=last_offer,
+                ):
+                    return True
+                if not last_offer:
+                    log.info("Trying the next qualifying offer")
+            elif atc_buttons:
+                return self.legacy_add_to_cart(
+                    atc_buttons[idx], asin, reserve_min, reserve_max, retry
                 )
+            else:
+                log.error("Unable to find OfferID...")
+        return False
 
-            elif reserve_max < (price_float + ship_float):
-                log.debug(
-                    f"  Max ({reserve_max}) < Price ({price_float} + {ship_float} shipping)"
-                )
+    def legacy_add_to_cart(self, atc_button, asin, reserve_min, reserve_max, retry=0):
+        log.error("Unable to find offering ID to add to cart.  Using legacy mode.")
+        self.notification_handler.play_notify_sound()
+        if self.detailed:
+            self.send_notification(
+                message=f"Found Stock ASIN:{asin}",
+                page_name="Stock Alert",
+                take_screenshot=self.take_screenshots,
+            )
 
-            else:
-                log.error("Serious problem with price comparison")
-                log.error(f"  Min:   {reserve_min}")
-                log.error(f"  Price: {price_float} + {ship_float} shipping")
-                log.error(f"  Max:   {reserve_max}")
+        presence.buy_update()
+        current_title = self.driver.title
+        # log.info(f"current page title is {current_title}")
+        try:
+            atc_button.click()
+        except IndexError:
+            log.debug("Index Error")
+            return False
+        self.wait_for_page_change(current_title)
+        # log.info(f"page title is {self.driver.title}")
+        emtpy_cart_elements = self.driver.find_elements(
+            By.XPATH,
+            "//div[contains(@class, 'sc-your-amazon-cart-is-empty') or contains(@class, 'sc-empty-cart')]",
+        )
 
-        log.info(f"Offers exceed price range ({reserve_min:.2f}-{reserve_max:.2f})")
-        return in_stock
+        if (
+            not emtpy_cart_elements
+            and self.driver.title in amazon_config["SHOPPING_CART_TITLES"]
+        ):
+            return True
+        else:
+            log.warning("Did not add to cart, trying again")
+            if emtpy_cart_elements:
+                log.info("Cart appeared empty after clicking Add To Cart button")
+            log.debug(f"failed title was {self.driver.title}")
+            self.send_notification(
+                "Failed Add to Cart", "failed-atc", self.take_screenshots
+            )
+            self.save_page_source("failed-atc")
+            return self.check_stock(
+                asin=asin,
+                reserve_max=reserve_max,
+                reserve_min=reserve_min,
+                retry=retry + 1,
+            )
 
-    def buy_it_now(self, offering_id, max_atc_retries=DEFAULT_MAX_ATC_TRIES):
-        retry = 0
-        successful = False
-        while not successful:
-            buy_it_now_url = f"{AMAZON_URLS['BIN_URL']}?buyNow=1&skipCart=1&offeringID={offering_id}&quantity=1"
-            with self.wait_for_page_content_change():
-                self.driver.get(buy_it_now_url)
-            timeout = self.get_timeout(5)
-            while self.driver.title == "" and time.time() < timeout:
-                time.sleep(0.5)
-            if self.driver.title not in amazon_config["CHECKOUT_TITLES"]:
-                retry += 1
-                if retry > max_atc_retries:
-                    return False
-                continue
-            try:
-                place_order_button = self.driver.find_element(By.XPATH,
-                    "//input[@name='placeYourOrder1' and @type='submit']"
+    def check_offer_snapshots(
+        self,
+        asin,
+        reserve_min,
+        reserve_max,
+        buy_box=False,
+        region_html=None,
+        deadline=None,
+    ):
+        """Evaluates the offers from a single copy of the offer region instead of querying
+        each price, shipping block and ATC button through WebDriver.  The region is polled
+        for unless an already rendered copy is passed in."""
+        rendered = region_html is not None
+        timeout = DEFAULT_MAX_TIMEOUT
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+        for _ in poll(timeout=timeout):
+            if not rendered:
+                region_html = self.get_offer_region(buy_box)
+            if region_html:
+                fingerprint = offer_region_fingerprint(
+                    region_html, reserve_min, reserve_max
                 )
-            except sel_exceptions.NoSuchElementException:
-                log.info("No PYO button found, don't ask why")
-                retry += 1
-                if retry > max_atc_retries:
+                if self.offer_fingerprints.get(asin) == fingerprint:
+                    log.debug(f"Offers for {asin} unchanged since last check")
+                    return False
+                offers = parse_offer_snapshots(region_html, buy_box=buy_box)
+                if offers:
+                    break
+            if rendered:
+                log.info("No offers found.  Moving on.")
+                return False
+        else:
+            log.warning(f"failed to load offers for {asin}, going to next ASIN")
+            return False
+
+        ranked = rank_offers(
+            offers_in_reserve(
+                offers,
+                reserve_min,
+                reserve_max,
+                free_shipping_only=not self.checkshipping,
+            ),
+            self.condition,
+        )
+        if not ranked:
+            log.info(f"Offers exceed price range ({reserve_min:.2f}-{reserve_max:.2f})")
+            self.offer_fingerprints[asin] = fingerprint
+            return False
+        self.offer_fingerprints.pop(asin, None)
+        return self.purchase_ranked_offers(asin, ranked, reserve_min, reserve_max)
+
+    def wait_for_offer_render(self, timeout=DEFAULT_MAX_TIMEOUT):
+        """Waits in the page for the offers or an unavailable marker to render, returning
+        the offer region's HTML in the same call.  None means polling has to take over,
+        since the observer couldn't run."""
+        try:
+            rendered = self.driver.execute_async_script(
+                OFFER_RENDER_SCRIPT,
+                AOD_REGION_IDS,
+                BUY_BOX_REGION_IDS,
+                UNAVAILABLE_IDS,
+                int(timeout * 1000),
+            )
+        except sel_exceptions.WebDriverException as e:
+            log.debug(f"Offer render observer failed: {e}")
+            return None
+        if not rendered:
+            return None
+        return RenderedOffers(
+            state=rendered["state"],
+            buy_box=rendered.get("buyBox", False),
+            html=rendered.get("html"),
+        )
+
+    def read_page(self, script, *args):
+        """Runs a read-only script over the DevTools channel when it is connected, and
+        through WebDriver otherwise or if the channel fails"""
+        if self.devtools.connected:
+            try:
+                return self.devtools.execute_script(script, *args)
+            except DevToolsError as e:
+                log.debug(f"DevTools probe failed, using WebDriver: {e}")
+        return self.driver.execute_script(script, *args)
+
+    def page_title(self):
+        if self.devtools.connected:
+            try:
+                return self.devtools.title()
+            except DevToolsError as e:
+                log.debug(f"DevTools title failed, using WebDriver: {e}")
+        return self.driver.title
+
+    def set_request_blocking(self, blocking):
+        """Blocks the stock check block list, or lets everything load again for checkout"""
+        if not self.blocked_urls or blocking == self.request_blocking:
+            return
+        try:
+            self.driver.execute_cdp_cmd(
+                "Network.setBlockedURLs",
+                {"urls": self.blocked_urls if blocking else []},
+            )
+        except sel_exceptions.WebDriverException as e:
+            log.debug(f"Failed to set blocked URLs: {e}")
+            return
+        self.request_blocking = blocking
+
+    def report_check_transfer(self, asin, transferred, blocked):
+        try:
+            # Pick up the network events the check left in the log
+            self.page_events.read()
+        except sel_exceptions.WebDriverException as e:
+            log.debug(f"Lost track of page events: {e}")
+            return
+        transferred = self.page_events.transferred - transferred
+        blocked = self.page_events.blocked - blocked
+        self.check_transfers.append(transferred)
+        mean = sum(self.check_transfers) / len(self.check_transfers)
+        log.info(
+            f"Check of {asin} transferred {transferred / 1024:.1f} KiB, "
+            f"{blocked} requests blocked "
+            f"(mean {mean / 1024:.1f} KiB over {len(self.check_transfers)} checks)"
+        )
+
+    def fetch_offer_listings(self, asins, deadline):
+        """Fetches the offer listings of asins in one call, from inside the Amazon page
+        that is open, without navigating.  Listings that don't come back are left for
+        check_stock to load the usual way."""
+        if self.http_offers:
+            return self.fetch_offer_listings_http(asins, deadline)
+        urls = [AMAZON_URLS["AOD_URL"] + asin for asin in asins]
+        for attempt in range(2):
+            try:
+                results = self.driver.execute_async_script(
+                    FETCH_OFFERS_SCRIPT,
+                    urls,
+                    int(deadline.cap(DEFAULT_MAX_TIMEOUT) * 1000),
+                )
+            except sel_exceptions.WebDriverException as e:
+                log.debug(f"Failed to fetch offer listings: {e}")
+                return
+            # Only retry when fetch() couldn't run at all, not over a single bad listing
+            if attempt or any(result["status"] for result in results):
+                break
+            # fetch() needs an Amazon page to run from; the last checkout may have left
+            log.debug("Offer listing fetch failed, going back to the home page")
+            self.get_page(
+                AMAZON_URLS["BASE_URL"], timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)
+            )
+        self.keep_offer_listings(asins, results)
+
+    def fetch_offer_listings_http(self, asins, deadline):
+        """Fetches the offer listings of asins with one keep-alive GET each, over a
+        session that carries the browser's cookies, leaving the browser alone"""
+        results = []
+        for asin in asins:
+            try:
+                if self.http_session is None:
+                    self.http_session = DriverSession(
+                        self.driver, timeout=DEFAULT_MAX_TIMEOUT
+                    )
+                response = self.http_session.get(
+                    AMAZON_URLS["AOD_URL"] + asin,
+                    timeout=deadline.cap(DEFAULT_MAX_TIMEOUT),
+                )
+            except (requests.RequestException, sel_exceptions.WebDriverException) as e:
+                results.append({"status": 0, "error": str(e)})
+                continue
+            if response is None:
+                results.append({"status": 0, "error": "redirected with fresh cookies"})
+            else:
+                results.append({"status": response.status_code, "html": response.text})
+        self.keep_offer_listings(asins, results)
+
+    def keep_offer_listings(self, asins, results):
+        for asin, result in zip(asins, results):
+            if result["status"] != 200:
+                log.debug(
+                    f"Fetching offers for {asin} failed ({result['status']}): "
+                    f"{result.get('error')}"
+                )
+            elif "validateCaptcha" in result["html"]:
+                # Loading the offer page the usual way goes through the captcha handler
+                log.debug(f"Fetching offers for {asin} hit a captcha")
+            else:
+                self.fetched_listings[asin] = result["html"]
+
+    def capture_offer_listing(self, since, deadline):
+        """Takes the offer listing from the flyout's AJAX response as soon as it arrives,
+        ahead of layout and paint, and stops the rest of the page from loading.  None
+        means the render path has to take over."""
+        try:
+            # The page may have asked for the flyout by itself
+            request_id = self.page_events.wait_for_response(since, timeout=0)
+            if request_id is None:
+                opened = self.driver.execute_script(OPEN_OFFERS_SCRIPT, UNAVAILABLE_IDS)
+                if opened == "unavailable":
+                    return RenderedOffers(state="unavailable", buy_box=False, html=None)
+                if opened != "opened":
+                    return None
+                request_id = self.page_events.wait_for_response(
+                    since, timeout=deadline.cap(DEFAULT_MAX_TIMEOUT)
+                )
+                if request_id is None:
+                    return None
+            payload = self.page_events.response_body(request_id)
+            # Offers are bought through their offer IDs, so nothing else on the page is
+            # needed any more
+            self.driver.execute_script("window.stop();")
+        except sel_exceptions.WebDriverException as e:
+            log.debug(f"Failed to capture the offer listing: {e}")
+            return None
+        return RenderedOffers(state="offers", buy_box=False, html=payload)
+
+    def get_offer_region(self, buy_box=False):
+        """Pulls the outer HTML of the offer region out of the browser in one call"""
+        region_ids = BUY_BOX_REGION_IDS if buy_box else AOD_REGION_IDS
+        try:
+            return self.read_page(OFFER_REGION_SCRIPT, region_ids)
+        except sel_exceptions.WebDriverException as e:
+            log.debug(f"Failed to read offer region: {e}")
+            return None
+
+    def purchase_offer(
+        self, offering_id, asin, max_atc_retries=20, report_failure=True
+    ):
+        """Checks out a single offer.  A failure is only reported with a screenshot and
+        the page source when report_failure is set, as capturing them takes seconds."""
+        log.info("Attempting Add To Cart with offer ID...")
+        if not self.alt_checkout:
+            if self.buy_it_now(offering_id, max_atc_retries=max_atc_retries):
+                return True
+            elif not report_failure:
+                log.warning(f"Buy it Now failed for offer {offering_id}")
+                return False
+            else:
+                self.send_notification(
+                    "Failed Buy it Now ",
+                    "failed-BIN",
+                    self.take_screenshots,
+                )
+                self.save_page_source("failed-atc")
+                return False
+        else:
+            if self.attempt_atc(offering_id, asin):
+                return True
+            elif not report_failure:
+                log.warning(f"Add to cart failed for offer {offering_id}")
+                return False
+            else:
+                self.send_notification(
+                    "Failed ATC ",
+                    "failed-ATC",
+                    self.take_screenshots,
+                )
+                self.save_page_source("failed-atc")
+                return False
+
+    def buy_it_now(self, offering_id, max_atc_retries=DEFAULT_MAX_ATC_TRIES):
+        retry = 0
+        successful = False
+        while not successful:
+            buy_it_now_url = f"{AMAZON_URLS['BIN_URL']}?buyNow=1&skipCart=1&offeringID={offering_id}&quantity=1"
+            with self.wait_for_page_content_change():
+                self.driver.get(buy_it_now_url)
+            title = wait_until(
+                self.page_title,
+                timeout=5,
+                max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+            )
+            if title not in amazon_config["CHECKOUT_TITLES"]:
+                retry += 1
+                if retry > max_atc_retries:
+                    return False
+                continue
+            try:
+                place_order_button = self.driver.find_element(By.XPATH,
+                    "//input[@name='placeYourOrder1' and @type='submit']"
+                )
+            except sel_exceptions.NoSuchElementException:
+                log.info("No PYO button found, don't ask why")
+                retry += 1
+                if retry > max_atc_retries:
                     return False
                 continue
             if place_order_button:
@@ -922,10 +1963,12 @@ class Amazon:
                     if retry > max_atc_retries:
                         return False
                     continue
-                timeout = self.get_timeout(5)
-                while self.driver.title == "" and time.time() < timeout:
-                    time.sleep(0.5)
-                if self.driver.title in amazon_config["ORDER_COMPLETE_TITLES"]:
+                title = wait_until(
+                    self.page_title,
+                    timeout=5,
+                    max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+                )
+                if title in amazon_config["ORDER_COMPLETE_TITLES"]:
                     log.info("maybe this worked, check your orders")
                     self.save_screenshot("Order-Complete-Maybe")
                     successful = True
@@ -972,56 +2015,86 @@ class Amazon:
     # search lists of asin lists, and remove the first list that matches provided asin
     @debug
     def remove_asin_list(self, asin):
-        for i in range(len(self.asin_list)):
-            if asin in self.asin_list[i]:
-                self.asin_list.pop(i)
-                self.reserve_max.pop(i)
-                self.reserve_min.pop(i)
-                break
+        with self.asin_lock:
+            for i in range(len(self.asin_list)):
+                if asin in self.asin_list[i]:
+                    self.asin_list.pop(i)
+                    self.reserve_max.pop(i)
+                    self.reserve_min.pop(i)
+                    break
 
     # checkout page navigator
     @debug
+    def classify_page(self, title):
+        page = page_classifier.classify(title)
+        if page is None and title:
+            page = self.match_page_signature()
+        return page
+
+    def match_page_signature(self):
+        try:
+            idx = self.read_page(
+                PAGE_SIGNATURE_SCRIPT, [selector for _, selector in PAGE_SIGNATURES]
+            )
+        except sel_exceptions.WebDriverException as e:
+            log.debug(f"Failed to match page signature: {e}")
+            return None
+        if idx is None or idx < 0:
+            return None
+        page = PAGE_SIGNATURES[idx][0]
+        log.debug(f"Page identified as {page} by its elements")
+        return page
+
     def navigate_pages(self, test):
-        title = self.driver.title
+        self.page_changed()
+        title = self.page_title()
         log.debug(f"Navigating page title: '{title}'")
+        page = None
         # see if this resolves blank page title issue?
         if title == "":
             timeout_seconds = DEFAULT_MAX_TIMEOUT
             log.debug(
                 f"Title was blank, checking to find a real title for {timeout_seconds} seconds"
             )
-            timeout = self.get_timeout(timeout=timeout_seconds)
-            while time.time() <= timeout:
-                if self.driver.title != "":
-                    title = self.driver.title
+            for _ in poll(
+                timeout=timeout_seconds, max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL
+            ):
+                title = self.page_title()
+                if title != "":
                     log.debug(f"found a real title: {title}.")
                     break
-                time.sleep(0.05)
+                # The page content may give it away before the title does
+                page = self.match_page_signature()
+                if page:
+                    break
             else:
                 log.debug("Time out reached, page title was still blank.")
 
-        if title in amazon_config["SIGN_IN_TITLES"]:
+        if page is None:
+            page = self.classify_page(title)
+
+        if page == "SIGN_IN_TITLES":
             self.login()
-        elif title in amazon_config["CAPTCHA_PAGE_TITLES"]:
+        elif page == "CAPTCHA_PAGE_TITLES":
             self.handle_captcha()
-        elif title in amazon_config["SHOPPING_CART_TITLES"]:
+        elif page == "SHOPPING_CART_TITLES":
             self.handle_cart()
-        elif title in amazon_config["CHECKOUT_TITLES"]:
+        elif page == "CHECKOUT_TITLES":
             self.handle_checkout(test)
-        elif title in amazon_config["ORDER_COMPLETE_TITLES"]:
+        elif page == "ORDER_COMPLETE_TITLES":
             self.handle_order_complete()
-        elif title in amazon_config["PRIME_TITLES"]:
+        elif page == "PRIME_TITLES":
             self.handle_prime_signup()
-        elif title in amazon_config["HOME_PAGE_TITLES"]:
+        elif page == "HOME_PAGE_TITLES":
             # if home page, something went wrong
             self.handle_home_page()
-        elif title in amazon_config["DOGGO_TITLES"]:
+        elif page == "DOGGO_TITLES":
             self.handle_doggos()
-        elif title in amazon_config["OUT_OF_STOCK"]:
+        elif page == "OUT_OF_STOCK":
             self.handle_out_of_stock()
-        elif title in amazon_config["BUSINESS_PO_TITLES"]:
+        elif page == "BUSINESS_PO_TITLES":
             self.handle_business_po()
-        elif title in amazon_config["ADDRESS_SELECT"]:
+        elif page == "ADDRESS_SELECT":
             if self.shipping_bypass:
                 self.handle_shipping_page()
             else:
@@ -1033,10 +2106,6 @@ class Amazon:
                 self.handle_unknown_title(title)
         else:
             log.debug(f"title is: [{title}]")
-            # see if we can handle blank titles here
-            time.sleep(
-                3
-            )  # wait a few seconds for page to load, since we don't know what we are dealing with
             log.warning(
                 "FairGame is not sure what page it is on - will attempt to resolve."
             )
@@ -1044,15 +2113,22 @@ class Amazon:
             # PERFORM ELEMENT CHECKS TO SEE IF WE CAN FIGURE OUT WHERE WE ARE #
             ###################################################################
 
-            element = None
+            probes = self.amazon_probes("PRIME_NO_THANKS", "ADDRESS_SELECT", "CART")
+            probes["ORDER_SUCCESS"] = [ORDER_SUCCESS_XPATH]
+
+            def found_any():
+                probed = self.probe_page_state(probes)
+                return probed if probed and probed.elements else None
+
+            # give the page a few seconds to load, since we don't know what we are
+            # dealing with, but stop as soon as one of the elements we look for turns up
+            state = wait_until(
+                found_any,
+                timeout=UNKNOWN_PAGE_DELAY,
+                max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+            ) or PageState(title, {})
             # check page for order complete?
-            try:
-                element = self.driver.find_element(By.XPATH,
-                    '//*[@class="a-box a-alert a-alert-success"]'
-                )
-            except sel_exceptions.NoSuchElementException:
-                pass
-            if element:
+            if state.get("ORDER_SUCCESS"):
                 log.info(
                     "FairGame thinks it completed the purchase, please verify ASAP"
                 )
@@ -1069,15 +2145,10 @@ class Amazon:
                 self.handle_order_complete()
                 return
 
-            element = None
             # Prime offer page?
-            try:
-                element = self.get_amazon_element(key="PRIME_NO_THANKS")
-            except sel_exceptions.NoSuchElementException:
-                pass
-            if element:
+            if state.get("PRIME_NO_THANKS"):
                 if self.do_button_click(
-                    button=element,
+                    button=state.get("PRIME_NO_THANKS").element,
                     clicking_text="FairGame thinks it is seeing a Prime Offer, attempting to click No Thanks",
                     fail_text="FairGame could not click No Thanks button",
                     log_debug=True,
@@ -1086,10 +2157,13 @@ class Amazon:
             # see if a use this address (or similar) button is on page (based on known xpaths). Only check if
             # user has set the shipping_bypass flag
             if self.shipping_bypass:
-                if self.handle_shipping_page():
+                address_select = state.get("ADDRESS_SELECT")
+                if self.handle_shipping_page(
+                    address_select.element if address_select else None
+                ):
                     return
 
-            if self.get_cart_count() == 0:
+            if state.cart_count == 0:
                 log.info("It appears you have nothing in your cart.")
                 log.info("Returning to stock check.")
                 self.try_to_checkout = False
@@ -1128,7 +2202,12 @@ class Amazon:
                 with self.wait_for_page_content_change(timeout=10):
                     self.driver.refresh()
                 return
-            time.sleep(1)  # wait a second for page to load
+            # wait up to a second for the cart count to load
+            wait_until(
+                lambda: self.get_cart_count() != -1,
+                timeout=1,
+                max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+            )
             # verify cart quantity is not zero
             # note, not using greater than 0, in case there is an error,
             # still want to try and proceed, if possible
@@ -1139,16 +2218,14 @@ class Amazon:
                 return
 
             log.info("trying to click proceed to checkout")
-            timeout = self.get_timeout()
-            while True:
-                try:
-                    button = self.get_amazon_element(key="PTC")
-                    break
-                except sel_exceptions.NoSuchElementException:
-                    button = None
-                if time.time() > timeout:
-                    log.error("Could not find and click button")
-                    break
+            button = wait_until(
+                lambda: self.get_amazon_element(key="PTC"),
+                ignored_exceptions=(sel_exceptions.NoSuchElementException,),
+                timeout=DEFAULT_MAX_TIMEOUT,
+                max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+            )
+            if not button:
+                log.error("Could not find and click button")
             if button:
                 if self.do_button_click(
                     button=button,
@@ -1187,12 +2264,12 @@ class Amazon:
         return
 
     # Method to try and click the handle shipping page
-    def handle_shipping_page(self):
-        element = None
-        try:
-            element = self.get_amazon_element(key="ADDRESS_SELECT")
-        except sel_exceptions.NoSuchElementException:
-            pass
+    def handle_shipping_page(self, element=None):
+        if element is None:
+            try:
+                element = self.get_amazon_element(key="ADDRESS_SELECT")
+            except sel_exceptions.NoSuchElementException:
+                pass
         if element:
             log.warning("FairGame thinks it needs to pick a shipping address.")
             log.warning("It will click whichever ship to this address button it found.")
@@ -1213,18 +2290,70 @@ class Amazon:
         self.save_page_source(page="shipping-select-error")
         return False
 
+    def probe_page_state(self, probes) -> Optional[PageState]:
+        """Looks up every name of probes in a single round trip to the browser.  Each name
+        maps to a list of alternative XPaths, the first one that matches wins."""
+        try:
+            state = self.driver.execute_script(PAGE_STATE_SCRIPT, probes)
+        except sel_exceptions.WebDriverException as e:
+            log.debug(f"Failed to probe page state: {e}")
+            return None
+        elements = {}
+        for name, probed in state["elements"].items():
+            expression = probes[name][probed["index"]]
+            if name in xpaths.alternatives:
+                selector_stats.record(name, expression)
+            elements[name] = ProbedElement(
+                element=probed["element"],
+                enabled=probed["enabled"],
+                displayed=probed["displayed"],
+                text=probed["text"],
+                expression=expression,
+            )
+        return PageState(title=state["title"], elements=elements)
+
+    def amazon_probes(self, *keys):
+        return {key: self.ordered_alternatives(key) for key in keys}
+
+    def ordered_alternatives(self, key):
+        return selector_stats.order(key, xpaths.alternatives[key])
+
+    def page_changed(self):
+        self.page_generation += 1
+
+    def page_cached(self, key, lookup):
+        """Returns the result of lookup(), memoised until the next page change"""
+        cached = self.page_cache.get(key)
+        if cached is not None and cached[0] == self.page_generation:
+            return cached[1]
+        value = lookup()
+        self.page_cache[key] = (self.page_generation, value)
+        return value
+
     def get_amazon_element(self, key):
-        return self.driver.find_element(By.XPATH,
-            join_xpaths(amazon_config["XPATHS"][key])
-        )
+        # Only found elements are memoised, so polling for one that is yet to appear
+        # still goes to the browser every time
+        return self.page_cached(("element", key), lambda: self.find_first_match(key))
+
+    def find_first_match(self, key):
+        """Tries the alternatives of an XPATHS key in order of past hits, stopping at the
+        first one that matches"""
+        alternatives = self.ordered_alternatives(key)
+        found = self.driver.execute_script(FIRST_MATCH_SCRIPT, alternatives)
+        if not found:
+            raise sel_exceptions.NoSuchElementException(f"No element found for {key}")
+        element, index = found
+        selector_stats.record(key, alternatives[index])
+        return element
 
     def get_amazon_elements(self, key):
-        return self.driver.find_elements(
-            By.XPATH, join_xpaths(amazon_config["XPATHS"][key])
-        )
+        return self.driver.find_elements(By.XPATH, xpaths.get(key))
 
     # returns negative number if cart element does not exist, returns number if cart exists
     def get_cart_count(self):
+        cached = self.page_cache.get("cart_count")
+        if cached is not None and cached[0] == self.page_generation:
+            return cached[1]
         # check if cart number is on the page, if cart items = 0
         try:
             element = self.get_amazon_element(key="CART")
@@ -1232,22 +2361,25 @@ class Amazon:
             return -1
         if element:
             try:
-                return int(element.text)
+                count = int(element.text)
             except Exception as e:
                 log.debug("Error converting cart number to integer")
                 log.debug(e)
                 return -1
+            self.page_cache["cart_count"] = (self.page_generation, count)
+            return count
 
     @debug
     def handle_prime_signup(self):
         log.info("Prime offer page popped up, attempting to click No Thanks")
-        time.sleep(
-            2
-        )  # just doing manual wait, sign up for prime if you don't want to deal with this
-        button = None
-        try:
-            button = self.get_amazon_element(key="PRIME_NO_THANKS")
-        except sel_exceptions.NoSuchElementException:
+        # sign up for prime if you don't want to deal with this
+        button = wait_until(
+            lambda: self.get_amazon_element(key="PRIME_NO_THANKS"),
+            ignored_exceptions=(sel_exceptions.NoSuchElementException,),
+            timeout=2,
+            max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+        )
+        if not button:
             log.error("could not find button")
             log.info("sign up for Prime and this won't happen anymore")
             self.save_page_source("prime-signup-error")
@@ -1256,7 +2388,7 @@ class Amazon:
                 "prime-signup-error",
                 self.take_screenshots,
             )
-        if button:
+        else:
             if self.do_button_click(
                 button=button,
                 clicking_text="Attempting to click No Thanks button on Prime Signup Page",
@@ -1346,45 +2478,44 @@ class Amazon:
             self.save_screenshot("ptc-page")
         except:
             pass
-        timeout = self.get_timeout()
         button = None
-        while True:
-            try:
-                button = self.get_amazon_element(key="PTC")
-                break
-            except sel_exceptions.NoSuchElementException:
-                if self.shipping_bypass:
-                    try:
-                        button = self.get_amazon_element(key="ADDRESS_SELECT")
-                        break
-                    except sel_exceptions.NoSuchElementException:
-                        pass
-            if self.get_cart_count() == 0:
-                log.error("You have no items in cart. Going back to stock check.")
-                self.try_to_checkout = False
-                break
-
-            if time.time() > timeout:
-                log.error("couldn't find buttons to proceed to checkout")
-                self.save_page_source("ptc-error")
-                self.send_notification(
-                    "Proceed to Checkout Error Occurred",
-                    "ptc-error",
-                    self.take_screenshots,
-                )
-                # if self.get_cart_count() == 0:
-                #     log.info("It appears this is because you have no items in cart.")
-                #     log.info(
-                #         "It is likely that the product went out of stock before you could checkout"
-                #     )
-                #     log.info("Going back to stock check.")
-                #     self.try_to_checkout = False
-                # else:
-                log.info("Refreshing page to try again")
-                with self.wait_for_page_content_change():
-                    self.driver.refresh()
-                self.checkout_retry += 1
-                return
+        probes = self.amazon_probes("PTC", "ADDRESS_SELECT", "CART")
+        for _ in poll(
+            timeout=DEFAULT_MAX_TIMEOUT, max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL
+        ):
+            state = self.probe_page_state(probes)
+            if state:
+                probed = state.get("PTC")
+                if probed is None and self.shipping_bypass:
+                    probed = state.get("ADDRESS_SELECT")
+                if probed:
+                    button = probed.element
+                    break
+                if state.cart_count == 0:
+                    log.error("You have no items in cart. Going back to stock check.")
+                    self.try_to_checkout = False
+                    break
+        else:
+            log.error("couldn't find buttons to proceed to checkout")
+            self.save_page_source("ptc-error")
+            self.send_notification(
+                "Proceed to Checkout Error Occurred",
+                "ptc-error",
+                self.take_screenshots,
+            )
+            # if self.get_cart_count() == 0:
+            #     log.info("It appears this is because you have no items in cart.")
+            #     log.info(
+            #         "It is likely that the product went out of stock before you could checkout"
+            #     )
+            #     log.info("Going back to stock check.")
+            #     self.try_to_checkout = False
+            # else:
+            log.info("Refreshing page to try again")
+            with self.wait_for_page_content_change():
+                self.driver.refresh()
+            self.checkout_retry += 1
+            return
 
         if button:
             log.info("Found Checkout Button")
@@ -1405,45 +2536,48 @@ class Amazon:
 
     @debug
     def handle_checkout(self, test):
-        previous_title = self.driver.title
         button = None
-        timeout = self.get_timeout()
-        while True:
-            try:
-                button = self.driver.find_element(By.XPATH,self.button_xpaths[0])
-            except sel_exceptions.NoSuchElementException:
-                if self.shipping_bypass:
-                    try:
-                        button = self.get_amazon_element(key="ADDRESS_SELECT")
-                    except sel_exceptions.NoSuchElementException:
-                        pass
-                self.button_xpaths.append(self.button_xpaths.pop(0))
-            if button:
-                if button.is_enabled() and button.is_displayed():
+        # Every place order button is looked for at once, the most used ones first
+        probes = {
+            f"PYO_{idx}": [xpath]
+            for idx, xpath in enumerate(
+                selector_stats.order("PLACE_ORDER", self.button_xpaths)
+            )
+        }
+        probes.update(self.amazon_probes("ADDRESS_SELECT"))
+        for _ in poll(
+            timeout=DEFAULT_MAX_TIMEOUT, max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL
+        ):
+            state = self.probe_page_state(probes)
+            if state:
+                for name in probes:
+                    if name == "ADDRESS_SELECT" and not self.shipping_bypass:
+                        continue
+                    button = state.clickable(name)
+                    if button:
+                        if name != "ADDRESS_SELECT":
+                            selector_stats.record("PLACE_ORDER", probes[name][0])
+                        break
+                if button:
                     break
-            if time.time() > timeout:
-                log.error("couldn't find button to place order")
-                self.save_page_source("pyo-error")
-                self.send_notification(
-                    "Error in placing order.  Please check browser window.",
-                    "pyo-error",
-                    self.take_screenshots,
-                )
-                log.info("Refreshing page to try again")
-                self.driver.refresh()
-                time.sleep(DEFAULT_PAGE_WAIT_DELAY)
-                self.order_retry += 1
-                return
+        else:
+            log.error("couldn't find button to place order")
+            self.save_page_source("pyo-error")
+            self.send_notification(
+                "Error in placing order.  Please check browser window.",
+                "pyo-error",
+                self.take_screenshots,
+            )
+            log.info("Refreshing page to try again")
+            self.driver.refresh()
+            time.sleep(DEFAULT_PAGE_WAIT_DELAY)
+            self.order_retry += 1
+            return
         if test:
             self.end_time_atc = time.time()
             log.info(f"Found button {button.text}, but this is a test")
             log.info("will not try to complete order")
-            log.info(
-                f"  From cart: took {self.end_time_atc - self.start_time_atc} to check out"
-            )
-            log.info(
-                f"  From check: took {self.end_time_atc - self.start_time_check} to check out"
-            )
+            self.log_checkout_latency()
             self.try_to_checkout = False
             self.great_success = True
             if self.single_shot:
@@ -1456,12 +2590,7 @@ class Amazon:
     def handle_order_complete(self):
         self.end_time_atc = time.time()
         log.info("Order Placed.")
-        log.info(
-            f"  From cart: took {self.end_time_atc - self.start_time_atc} to check out"
-        )
-        log.info(
-            f"  From check: took {self.end_time_atc - self.start_time_check} to check out"
-        )
+        self.log_checkout_latency()
         self.send_notification("Order placed.", "order-placed", self.take_screenshots)
         self.notification_handler.play_purchase_sound()
         self.great_success = True
@@ -1470,6 +2599,20 @@ class Amazon:
         self.try_to_checkout = False
         log.info(f"checkout completed in {time.time() - self.start_time_atc} seconds")
 
+    def log_checkout_latency(self):
+        from_cart = self.end_time_atc - self.start_time_atc
+        self.checkout_latencies.append(from_cart)
+        log.info(f"  From cart: took {from_cart} to check out")
+        log.info(
+            f"  From check: took {self.end_time_atc - self.start_time_check} to check out"
+        )
+        if len(self.checkout_latencies) > 1:
+            log.info(
+                f"  Checkout latency over {len(self.checkout_latencies)} runs: "
+                f"best {min(self.checkout_latencies):.3f}s, "
+                f"mean {sum(self.checkout_latencies) / len(self.checkout_latencies):.3f}s"
+            )
+
     @debug
     def handle_doggos(self):
         self.notification_handler.send_notification(
@@ -1488,7 +2631,11 @@ class Amazon:
     def handle_captcha(self, check_presence=True):
         # wait for captcha to load
         log.debug("Waiting for captcha to load.")
-        time.sleep(DEFAULT_MAX_WEIRD_PAGE_DELAY)
+        wait_until(
+            lambda: self.driver.find_elements(By.XPATH, CAPTCHA_IMAGE_XPATH),
+            timeout=DEFAULT_MAX_WEIRD_PAGE_DELAY,
+            max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+        )
         current_page = self.driver.title
         try:
             if not check_presence or self.driver.find_element(By.XPATH,
@@ -1572,18 +2719,14 @@ class Amazon:
     @debug
     def handle_business_po(self):
         log.info("On Business PO Page, Trying to move on to checkout")
-        button = None
-        timeout = self.get_timeout()
-        while True:
-            try:
-                button = self.driver.find_element(By.XPATH,
-                    '//*[@id="a-autoid-0"]/span/input'
-                )
-                break
-            except sel_exceptions.NoSuchElementException:
-                pass
-            if time.time() > timeout:
-                break
+        button = wait_until(
+            lambda: self.driver.find_element(
+                By.XPATH, '//*[@id="a-autoid-0"]/span/input'
+            ),
+            ignored_exceptions=(sel_exceptions.NoSuchElementException,),
+            timeout=DEFAULT_MAX_TIMEOUT,
+            max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+        )
         if button:
             current_page = self.driver.title
             button.click()
@@ -1600,6 +2743,12 @@ class Amazon:
     def save_screenshot(self, page):
         file_name = get_timestamp_filename("screenshots/screenshot-" + page, ".png")
         try:
+            if self.devtools.connected:
+                try:
+                    self.devtools.screenshot(file_name)
+                    return file_name
+                except DevToolsError as e:
+                    log.debug(f"DevTools screenshot failed, using WebDriver: {e}")
             self.driver.save_screenshot(file_name)
             return file_name
         except sel_exceptions.TimeoutException:
@@ -1621,6 +2770,17 @@ class Amazon:
     @contextmanager
     def wait_for_page_content_change(self, timeout=5):
         """Utility to help manage selenium waiting for a page to load after an action, like a click"""
+        if self.page_events.enabled:
+            since = self.page_events.mark()
+            yield
+            try:
+                if not self.page_events.wait_for_navigation(since, timeout=timeout):
+                    log.info("Timed out reloading page, trying to continue anyway")
+            except Exception as e:
+                log.error(f"Trying to recover from error: {e}")
+            finally:
+                self.page_changed()
+            return None
         old_page = self.driver.find_element(By.TAG_NAME,"html")
         yield
         try:
@@ -1634,15 +2794,18 @@ class Amazon:
         except Exception as e:
             log.error(f"Trying to recover from error: {e}")
             pass
+        finally:
+            self.page_changed()
         return None
 
     def wait_for_page_change(self, page_title, timeout=3):
-        time_to_end = self.get_timeout(timeout=timeout)
-        while time.time() < time_to_end and (
-            self.driver.title == page_title or not self.driver.title
-        ):
-            pass
-        if self.driver.title != page_title:
+        wait_until(
+            lambda: self.page_title() not in (page_title, ""),
+            timeout=timeout,
+            max_poll_interval=CHECKOUT_MAX_POLL_INTERVAL,
+        )
+        if self.page_title() != page_title:
+            self.page_changed()
             return True
         else:
             return False
@@ -1667,7 +2830,21 @@ class Amazon:
         for child in children:
             self.webdriver_child_pids.append(child.pid)
 
-    def get_page(self, url):
+    def get_page(self, url, timeout=DEFAULT_MAX_TIMEOUT):
+        if self.page_events.enabled:
+            since = self.page_events.mark()
+            try:
+                self.driver.get(url=url)
+            except sel_exceptions.WebDriverException:
+                log.error(f"Failed to load page at url: {url}")
+                return False
+            finally:
+                self.page_changed()
+            try:
+                return self.page_events.wait_for_navigation(since, timeout=timeout)
+            except sel_exceptions.WebDriverException as e:
+                log.debug(f"Lost track of page events: {e}")
+                return False
         check_cart_element = None
         current_page = []
         try:
@@ -1681,17 +2858,16 @@ class Amazon:
         except sel_exceptions.WebDriverException or sel_exceptions.TimeoutException:
             log.error(f"Failed to load page at url: {url}")
             return False
+        finally:
+            self.page_changed()
         if check_cart_element:
-            timeout = self.get_timeout()
-            while True:
-                try:
-                    check_cart_element.is_displayed()
-                except sel_exceptions.StaleElementReferenceException:
-                    break
-                if time.time() > timeout:
-                    return False
-            return True
-        elif self.wait_for_page_change(current_page):
+            return bool(
+                wait_until(
+                    lambda: EC.staleness_of(check_cart_element)(self.driver),
+                    timeout=timeout,
+                )
+            )
+        elif self.wait_for_page_change(current_page, timeout=min(3, timeout)):
             return True
         else:
             log.error("page did not change")
@@ -1707,6 +2883,7 @@ class Amazon:
         )
         log.info(f"--Offer URL of: {self.ACTIVE_OFFER_URL}")
         log.info(f"--Delay of {self.refresh_delay} seconds")
+        log.info(f"--Each ASIN check is limited to {self.check_timeout} seconds")
         if self.headless:
             log.info(f"--Chrome is running in Headless mode")
         if self.used:
@@ -1725,6 +2902,41 @@ class Amazon:
             log.info(f"--Detailed screenshots/notifications is enabled")
         if self.log_stock_check:
             log.info(f"--Additional stock check logging enabled")
+        if self.snapshot_offers:
+            log.info(f"--Offers are parsed from a single snapshot of the offer listing")
+        if self.devtools_probes:
+            log.info(f"--Page probes go straight to the browser's DevTools endpoint")
+        if self.capture_offers:
+            log.info(f"--Offer listings are read from the network as they arrive")
+        if self.async_offers:
+            log.info(
+                f"--Offer listings are fetched over HTTP, {self.concurrency} at a time "
+                f"and {self.rps} per second at most, instead of one ASIN per delay"
+            )
+        elif self.http_offers:
+            log.info(
+                f"--Offer listings are fetched over HTTP with the browser's cookies"
+            )
+        elif self.fetch_offers:
+            log.info(
+                f"--Offer listings are fetched from inside the page, "
+                f"{self.fetch_batch} ASIN(s) at a time"
+            )
+        if self.worker_count and not self.async_offers:
+            log.info(
+                f"--Stock is checked by {self.worker_count} workers, each with its own "
+                f"browser, and checked out in this one"
+            )
+        elif self.tabs > 1 and not (self.async_offers or self.slow_mode):
+            log.info(f"--Offer pages load side by side in {self.tabs} tabs")
+        if self.hot_spare:
+            log.info(f"--A standby browser is kept logged in to replace a failed one")
+        if self.block_requests:
+            log.info(
+                f"--{len(self.blocked_urls)} URL patterns are blocked while checking stock"
+            )
+        if self.report_transfer:
+            log.info(f"--Bytes transferred by each stock check are reported")
         if self.slow_mode:
             log.warning(f"--Slow-mode enabled. Pages will fully load before execution.")
         if self.shipping_bypass:
@@ -1771,28 +2983,23 @@ class Amazon:
             else:
                 prefs["profile.managed_default_content_settings.images"] = 0
             options.add_experimental_option("prefs", prefs)
-            options.add_argument(f"user-data-dir={path_to_profile}")
             if not self.slow_mode:
                 options.set_capability("pageLoadStrategy", "none")
+            # Page transitions are followed through DevTools events in the performance log
+            options.set_capability("goog:loggingPrefs", PERFORMANCE_LOG_CAPABILITY)
+            log_prefs = PERFORMANCE_LOG_PREFS
+            if self.capture_offers or self.report_transfer:
+                log_prefs = PERFORMANCE_LOG_NETWORK_PREFS
+            options.add_experimental_option("perfLoggingPrefs", log_prefs)
 
             self.setup_driver = False
 
-        # Delete crashed, so restore pop-up doesn't happen
-        path_to_prefs = os.path.join(
-            path_to_profile,
-            "Default",
-            "Preferences",
-        )
         try:
-            with fileinput.FileInput(path_to_prefs, inplace=True) as file:
-                for line in file:
-                    print(line.replace("Crashed", "none"), end="")
-        except FileNotFoundError:
-            pass
-        try:
-            self.driver = webdriver.Chrome(executable_path=binary_path, options=options)
-            self.wait = WebDriverWait(self.driver, 10)
+            self.driver = launch_driver(path_to_profile)
+            # PIDs of earlier browsers may belong to other processes by now
+            self.webdriver_child_pids = []
             self.get_webdriver_pids()
+            self.attach_driver()
         except Exception as e:
             log.error(e)
             log.error(
@@ -1806,7 +3013,154 @@ class Amazon:
 
         return True
 
+    def attach_driver(self):
+        """Hooks everything that follows the browser up to a newly started driver"""
+        # Every command, elements' included, goes through execute
+        self.driver.execute = self.watchdog.wrap(self.driver.execute)
+        self.watchdog.reset()
+        self.wait = WebDriverWait(self.driver, 10)
+        if self.page_events.attach(self.driver):
+            log.debug("Following page transitions through DevTools events")
+        else:
+            log.debug("Following page transitions by polling for stale elements")
+        if self.http_session is not None:
+            self.http_session.attach(self.driver)
+        self.request_blocking = False
+        if self.blocked_urls:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+        if self.devtools_probes and not self.devtools.connect(self.driver):
+            log.warning("Could not open DevTools channel, probing through WebDriver")
+
+    def restart_driver(self):
+        if self.hot_spare:
+            if self.spare_thread is not None:
+                # A standby on its way still beats a cold start
+                self.spare_thread.join(SPARE_WAIT_TIMEOUT)
+            if self.swap_in_spare():
+                self.page_changed()
+                return
+        log.info("Attempting to delete and recreate current chrome instance")
+        if not self.delete_driver():
+            log.error("Failed to delete chrome processes")
+            log.error("Please restart bot")
+            self.send_notification(
+                message="Bot Failed, please restart bot",
+                page_name="Bot Failed",
+                take_screenshot=False,
+            )
+            raise RuntimeError("Failed to restart bot")
+        elif not self.create_driver(self.profile_path):
+            log.error("Failed to recreate webdriver processes")
+            log.error("Please restart bot")
+            self.send_notification(
+                message="Bot Failed, please restart bot",
+                page_name="Bot Failed",
+                take_screenshot=False,
+            )
+            raise RuntimeError("Failed to restart bot")
+        else:  # deleted driver and recreated it succesfully
+            log.info("WebDriver recreated successfully. Returning back to stock check")
+            if self.hot_spare and self.spare_driver is None:
+                self.start_spare()
+        self.page_changed()
+
+    def start_spare(self, dead_driver=None, dead_pids=()):
+        """Builds a standby browser in the background, seeded with this browser's
+        cookies, once the browser it replaces has been reaped"""
+        cookies = self.driver.get_cookies()
+        self.spare_cookies = cookies
+        self.spare_thread = threading.Thread(
+            target=self.build_spare,
+            args=(cookies, dead_driver, list(dead_pids)),
+            name="spare-webdriver",
+            daemon=True,
+        )
+        self.spare_thread.start()
+
+    def build_spare(self, cookies, dead_driver, dead_pids):
+        if dead_driver is not None:
+            # Frees the profile the standby is about to open
+            reap_driver(dead_driver, dead_pids)
+        driver = None
+        try:
+            driver = launch_driver(self.spare_profile_path)
+            pids = driver_child_pids(driver)
+            seed_cookies(driver, cookies, self.amazon_website)
+        except Exception as e:
+            log.error(f"Failed to start a standby browser: {e}")
+            if driver is not None:
+                reap_driver(driver, [])
+            return
+        self.spare_pids = pids
+        self.spare_driver = driver
+        log.debug("Standby browser is ready")
+
+    def swap_in_spare(self):
+        """Switches over to the standby browser, if one is ready, leaving the failed one
+        to be reaped and a new standby to be built in the background"""
+        if self.spare_driver is None:
+            return False
+        dead_driver, dead_pids = self.driver, self.webdriver_child_pids
+        cookies = self.spare_cookies
+        try:
+            # A browser that failed to load a page may still hold a fresher session
+            # than the one the standby was seeded with
+            with self.watchdog.watch("getAllCookies", timeout=SPARE_COOKIE_TIMEOUT):
+                cookies = dead_driver.get_cookies()
+        except Exception as e:
+            log.debug(f"Using the standby's own cookies: {e}")
+        # Unhooks the watchdog, which only follows the driver in use
+        dead_driver.__dict__.pop("execute", None)
+        self.devtools.close()
+        self.driver, self.webdriver_child_pids = self.spare_driver, self.spare_pids
+        self.spare_driver, self.spare_pids = None, []
+        # The new standby opens the profile the failed browser leaves behind
+        self.profile_path, self.spare_profile_path = (
+            self.spare_profile_path,
+            self.profile_path,
+        )
+        self.attach_driver()
+        log.info("Switched over to the standby browser")
+        seed_cookies(self.driver, cookies, self.amazon_website)
+        self.get_page(AMAZON_URLS["BASE_URL"])
+        # The standby's session may have gone stale while it waited
+        self.handle_startup()
+        if not self.is_logged_in():
+            self.login()
+        self.start_spare(dead_driver, dead_pids)
+        return True
+
+    def delete_spare(self):
+        if self.spare_thread is not None:
+            self.spare_thread.join(SPARE_WAIT_TIMEOUT)
+        if self.spare_driver is not None:
+            reap_driver(self.spare_driver, self.spare_pids)
+            self.spare_driver = None
+
+    def recover_hung_driver(self, error):
+        log.error(f"Lost the browser: {error}")
+        log.info(
+            f"WebDriver hangs so far: {sum(self.watchdog.hangs.values())}, "
+            f"crashes: {sum(self.watchdog.crashes.values())}"
+        )
+        log.debug(f"Hangs by command: {dict(self.watchdog.hangs)}")
+        log.debug(f"Crashes by command: {dict(self.watchdog.crashes)}")
+        # Lets quit() talk to chromedriver again; the browser is gone or killed already
+        self.watchdog.reset()
+        self.kill_browser()
+        self.restart_driver()
+
+    def kill_browser(self):
+        for pid in self.webdriver_child_pids:
+            try:
+                psutil.Process(pid).kill()
+            except psutil.NoSuchProcess:
+                pass
+        self.webdriver_child_pids = []
+
     def delete_driver(self):
+        selector_stats.save()
+        self.devtools.close()
         try:
             if platform.system() == "Windows" and self.driver:
                 log.info("Cleaning up after web driver...")
@@ -1831,6 +3185,224 @@ class Amazon:
         return True
 
 
+class StockCheckWorker:
+    """Checks stock for its share of the ASINs in a browser of its own, and queues the
+    qualifying offers it finds for the Amazon instance that coordinates checkout"""
+
+    def __init__(self, amazon, number, cookies, delay):
+        self.amazon = amazon
+        self.number = number
+        self.cookies = cookies
+        self.delay = delay
+        self.profile_path = f"{amazon.profile_path}-worker{number + 1}"
+        self.driver = None
+        self.webdriver_child_pids = []
+        self.watchdog = Watchdog(on_hang=self.kill_browser)
+        self.checks = 0
+        self.started = time.time()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.run, name=f"stock-check-worker-{self.number + 1}", daemon=True
+        )
+        self.thread.start()
+
+    def join(self):
+        if self.thread is not None:
+            self.thread.join()
+
+    def alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def check_rate(self):
+        return self.checks / max(time.time() - self.started, 1)
+
+    def share(self):
+        """Every worker takes every nth ASIN, read afresh so that groups taken off the
+        list by a checkout drop out and the rest are spread over the workers again"""
+        with self.amazon.asin_lock:
+            keys = [
+                (asin, self.amazon.reserve_min[i], self.amazon.reserve_max[i])
+                for i, asins in enumerate(self.amazon.asin_list)
+                for asin in asins
+            ]
+        return keys[self.number :: len(self.amazon.workers)]
+
+    def run(self):
+        stopped = self.amazon.workers_stopped
+        fail_counter = 0
+        while not stopped.is_set():
+            try:
+                if self.driver is None and not self.create_driver():
+                    stopped.wait(DEFAULT_REFRESH_DELAY)
+                    continue
+                share = self.share()
+                if not share:
+                    # More workers than ASINs, or checkouts took this one's share
+                    stopped.wait(self.delay or DEFAULT_REFRESH_DELAY)
+                    continue
+                for asin, reserve_min, reserve_max in share:
+                    if stopped.is_set():
+                        break
+                    if self.amazon.log_stock_check:
+                        log.info(f"Worker {self.number + 1} checking ASIN: {asin}.")
+                    ranked = self.check(asin, reserve_min, reserve_max)
+                    self.checks += 1
+                    fail_counter = 0
+                    if ranked:
+                        self.amazon.found_offers.put((asin, ranked, self.number))
+                    stopped.wait(self.delay)
+            except DriverHungException as e:
+                log.error(f"Worker {self.number + 1} lost its browser: {e}")
+                self.watchdog.reset()
+                self.kill_browser()
+                self.delete_driver()
+            except sel_exceptions.WebDriverException as e:
+                fail_counter += 1
+                log.error(f"Worker {self.number + 1} failed to check stock: {e.msg}")
+                if fail_counter >= DEFAULT_MAX_URL_FAIL:
+                    fail_counter = 0
+                    self.delete_driver()
+                else:
+                    stopped.wait(self.delay)
+            except Exception as e:
+                log.error(f"Worker {self.number + 1} ran into an error: {e}")
+                self.delete_driver()
+                stopped.wait(DEFAULT_REFRESH_DELAY)
+        self.delete_driver()
+
+    def check(self, asin, reserve_min, reserve_max):
+        """Loads the offer page for asin and returns its offers in the reserve window,
+        ranked"""
+        deadline = Deadline(self.amazon.check_timeout)
+        self.driver.execute_script(MARK_STALE_SCRIPT)
+        self.driver.get(url=furl(self.amazon.ACTIVE_OFFER_URL + asin).url)
+        # The observer has to run in the new document, not the one being unloaded
+        if not wait_until(
+            lambda: self.driver.execute_script(PAGE_COMMITTED_SCRIPT),
+            ignored_exceptions=(sel_exceptions.WebDriverException,),
+            deadline=deadline,
+        ):
+            log.debug(f"Worker {self.number + 1} timed out loading {asin}")
+            return []
+        try:
+            rendered = self.driver.execute_async_script(
+                OFFER_RENDER_SCRIPT,
+                AOD_REGION_IDS,
+                BUY_BOX_REGION_IDS,
+                UNAVAILABLE_IDS,
+                int(deadline.remaining() * 1000),
+            )
+        except sel_exceptions.WebDriverException as e:
+            # The page went on to load another document, which is no reason to think
+            # the browser is broken
+            log.debug(f"Worker {self.number + 1} lost the offer page for {asin}: {e}")
+            return []
+        if not rendered or rendered["state"] != "offers":
+            if self.driver.title in amazon_config["CAPTCHA_PAGE_TITLES"]:
+                log.warning(f"Worker {self.number + 1} is looking at a captcha")
+            return []
+        return self.amazon.rank_listing(
+            asin, rendered["html"], reserve_min, reserve_max, rendered["buyBox"]
+        )
+
+    def create_driver(self):
+        worker_options = options_for_profile(self.profile_path)
+        # Nothing reads a worker's performance log
+        worker_options.experimental_options.pop("perfLoggingPrefs", None)
+        worker_options.set_capability("goog:loggingPrefs", {})
+        try:
+            self.driver = launch_driver(self.profile_path, worker_options)
+        except Exception as e:
+            log.error(f"Worker {self.number + 1} could not start a browser: {e}")
+            return False
+        self.driver.execute = self.watchdog.wrap(self.driver.execute)
+        self.watchdog.reset()
+        self.webdriver_child_pids = driver_child_pids(self.driver)
+        seed_cookies(self.driver, self.cookies, self.amazon.amazon_website)
+        return True
+
+    def kill_browser(self):
+        for pid in self.webdriver_child_pids:
+            try:
+                psutil.Process(pid).kill()
+            except psutil.NoSuchProcess:
+                pass
+        self.webdriver_child_pids = []
+
+    def delete_driver(self):
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception as e:
+            log.debug(f"Worker {self.number + 1} failed to quit its browser: {e}")
+        self.driver = None
+
+
+def launch_driver(path_to_profile, profile_options=None):
+    """Starts a browser on path_to_profile, with profile_options if given, which have to
+    open that profile, or else with the usual options"""
+    if profile_options is None:
+        profile_options = options_for_profile(path_to_profile)
+    # Delete crashed, so restore pop-up doesn't happen
+    path_to_prefs = os.path.join(
+        path_to_profile,
+        "Default",
+        "Preferences",
+    )
+    try:
+        with fileinput.FileInput(path_to_prefs, inplace=True) as file:
+            for line in file:
+                print(line.replace("Crashed", "none"), end="")
+    except FileNotFoundError:
+        pass
+    return webdriver.Chrome(executable_path=binary_path, options=profile_options)
+
+
+def driver_child_pids(driver):
+    driver_process = psutil.Process(driver.service.process.pid)
+    return [child.pid for child in driver_process.children(recursive=True)]
+
+
+def reap_driver(driver, child_pids):
+    """Gets rid of a browser that has failed.  It may not answer any more, so instead of
+    asking chromedriver to quit, which could block, its whole process tree is killed."""
+    pids = list(child_pids)
+    try:
+        driver_process = psutil.Process(driver.service.process.pid)
+        pids += [child.pid for child in driver_process.children(recursive=True)]
+        pids.append(driver_process.pid)
+    except psutil.NoSuchProcess:
+        pass
+    for pid in pids:
+        try:
+            psutil.Process(pid).kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
+def options_for_profile(path_to_profile):
+    """Returns a copy of the Chrome options that opens path_to_profile.  A profile can
+    only be open in one browser at a time, so every browser gets a copy of its own."""
+    profile_options = copy.deepcopy(options)
+    profile_options.add_argument(f"user-data-dir={path_to_profile}")
+    return profile_options
+
+
+def seed_cookies(driver, cookies, domain):
+    """Copies the cookies of a logged-in browser into another one"""
+    # Cookies can only be set on a page of their domain
+    driver.get(AMAZON_URLS["BASE_URL"])
+    wait_until(lambda: domain in driver.current_url, timeout=DEFAULT_MAX_TIMEOUT)
+    for cookie in cookies:
+        try:
+            driver.add_cookie(cookie)
+        except sel_exceptions.WebDriverException as e:
+            log.debug(f"Skipped cookie {cookie.get('name')}: {e}")
+
+
 def get_timestamp_filename(name, extension):
     """Utility method to create a filename with a timestamp appended to the root and before
     the provided file extension"""
@@ -1842,93 +3414,312 @@ def get_timestamp_filename(name, extension):
         return name + "_" + date + "." + extension
 
 
-def get_shipping_costs(tree):
-    # Top level wrapper method to be be called by the main code.  Various
-    # implementations should be called from here.  This allows newer mechanisms
-    # to be developed while still retaining fallback versions for older code
-    shipping_costs = get_shipping_costs_v3(tree)
-    if not shipping_costs:
-        shipping_costs = get_shipping_costs_v2(tree)
-    if not shipping_costs:
-        shipping_costs = get_alt_shipping_costs(tree, amazon_config["FREE_SHIPPING"])
-    return shipping_costs
-
-
-def get_shipping_costs_v3(tree):
-    # This version expects to find shipping in a element attribute called
-    # "data-csa-c-delivery-price" and it will either be text indicating
-    # that it's free or the fixed price as a float
-    shipping_price_xpath = ".//span/@data-csa-c-delivery-price"
-    shipping_price_nodes = tree.xpath(shipping_price_xpath)
-    if len(shipping_price_nodes) > 0:
-        shipping_text = shipping_price_nodes[0].upper()
-        if any(
-            shipping_text.upper() in free_message
-            for free_message in ["FREE", "FASTEST"]
+# lxml expressions used on every offer, compiled once
+AOD_OFFERS_XPATH = xpaths.compile(
+    "descendant-or-self::div[@id='aod-pinned-offer' or @id='aod-offer']"
+    "[.//input[@name='submit.addToCart']]"
+)
+AOD_CONDITION_FORM_XPATH = xpaths.compile("./following::form[@method='get']")
+BUY_BOX_FORM_XPATH = xpaths.compile("descendant-or-self::form[@id='addToCart']")
+BUY_BOX_OFFERING_ID_XPATH = xpaths.compile(
+    ".//input[@id='offerListingID' or @name='offerListingID']/@value"
+)
+BUY_BOX_SELLER_XPATH = xpaths.compile(
+    "descendant-or-self::*[@id='sellerProfileTriggerId' or @id='merchant-info']//text()"
+)
+BUY_BOX_PRICE_XPATH = xpaths.compile(
+    "descendant-or-self::div[@id='corePrice_feature_div']"
+    "//span[contains(concat(' ', @class, ' '), ' a-price ')"
+    " and not(contains(concat(' ', @class, ' '), ' a-text-price '))]"
+    "//span[@class='a-offscreen']"
+)
+
+
+class OfferSnapshot(NamedTuple):
+    price: Price
+    shipping: Price
+    condition: Optional["AmazonItemCondition"]
+    offering_id: Optional[str]
+    seller: Optional[str]
+
+
+def offer_region_fingerprint(region_html, reserve_min, reserve_max):
+    """Identifies what an offer region would evaluate to: a digest of its markup with
+    whitespace and per-render noise removed, the offer IDs it lists and the price range
+    it was checked against"""
+    normalised = " ".join(VOLATILE_MARKUP_RE.sub("", region_html).split())
+    offer_ids = tuple(
+        aod_id or buy_box_id for aod_id, buy_box_id in OFFER_ID_RE.findall(region_html)
+    )
+    digest = hashlib.sha1(normalised.encode("utf-8")).hexdigest()
+    return digest, offer_ids, reserve_min, reserve_max
+
+
+def parse_offer_snapshots(region_html, buy_box=False) -> List[OfferSnapshot]:
+    """Parses every offer out of the offer region HTML (AOD container or buy box)"""
+    tree = html.fromstring(region_html)
+    if buy_box:
+        return parse_buy_box_snapshot(tree)
+
+    return [extract_offer_fields(offer) for offer in AOD_OFFERS_XPATH(tree)]
+
+
+def is_offer_price(node):
+    """Whether node holds the price an offer sells at, rather than the struck through
+    list price, which is an a-price as well"""
+    classes = node.get("class", "").split()
+    return "a-price" in classes and "a-text-price" not in classes
+
+
+def extract_offer_fields(offer) -> OfferSnapshot:
+    """Walks an offer subtree once, picking up price, shipping, condition, offer ID and
+    seller on the way, instead of running a separate lookup for each of them"""
+    price_node = None
+    delivery_price = None
+    delivery_message = None
+    alt_shipping_node = None
+    seller_node = None
+    atc_button = None
+    atc_action = None
+    condition_action = None
+    for node in offer.iter("span", "div", "input", "form"):
+        tag = node.tag
+        if tag == "span":
+            if delivery_price is None:
+                delivery_price = node.get("data-csa-c-delivery-price")
+            if (
+                price_node is None
+                and node.get("class") == "a-offscreen"
+                and is_offer_price(node.getparent())
+            ):
+                price_node = node
+            if atc_action is None and node.get("data-action") == "aod-atc-action":
+                atc_action = node.get("data-aod-atc-action")
+        elif tag == "div":
+            node_id = node.get("id")
+            if not node_id:
+                continue
+            if node_id == "delivery-message":
+                if delivery_message is None:
+                    delivery_message = node
+            elif node_id.startswith("aod-bottlingDepositFee-"):
+                if alt_shipping_node is None:
+                    alt_shipping_node = next_element(node)
+            elif node_id == "aod-offer-soldBy":
+                seller_node = node
+        elif tag == "input":
+            if atc_button is None and node.get("name") == "submit.addToCart":
+                atc_button = node
+        elif (
+            atc_button is not None
+            and condition_action is None
+            and node.get("method") == "get"
         ):
-            # We found some version of "free" inside the span.. but this relies on a match
+            # Condition is divulged by the first GET form following the ATC button
+            condition_action = node.get("action", "")
+
+    if condition_action is None and atc_button is not None:
+        # The form may sit outside of this offer's subtree
+        condition_forms = AOD_CONDITION_FORM_XPATH(atc_button)
+        if condition_forms:
+            condition_action = condition_forms[0].get("action", "")
+
+    offering_id = None
+    if atc_action:
+        try:
+            offering_id = json.loads(atc_action)["oid"]
+        except (ValueError, KeyError):
+            log.debug(f"Unable to parse offer ID from '{atc_action}'")
+
+    seller = None
+    if seller_node is not None:
+        for node in seller_node.iter("a", "span"):
+            if node.text and (
+                node.tag == "a" or "a-color-base" in node.get("class", "")
+            ):
+                seller = node.text.strip()
+                break
+
+    return OfferSnapshot(
+        price=parse_offer_price([price_node] if price_node is not None else []),
+        shipping=get_offer_shipping(
+            delivery_price, delivery_message, alt_shipping_node
+        ),
+        condition=(
+            get_item_condition(condition_action)
+            if condition_action is not None
+            else None
+        ),
+        offering_id=offering_id,
+        seller=seller,
+    )
+
+
+def parse_buy_box_snapshot(tree) -> List[OfferSnapshot]:
+    # Anything in the Buy Box on the PDP *must* be New
+    forms = BUY_BOX_FORM_XPATH(tree)
+    if not forms:
+        return []
+    form = forms[0]
+    offering_ids = BUY_BOX_OFFERING_ID_XPATH(form)
+    seller = "".join(BUY_BOX_SELLER_XPATH(tree)).strip()
+    return [
+        OfferSnapshot(
+            price=parse_offer_price(BUY_BOX_PRICE_XPATH(tree)),
+            shipping=get_shipping_costs(form) or FREE_SHIPPING_PRICE,
+            condition=AmazonItemCondition.New,
+            offering_id=offering_ids[0] if offering_ids else None,
+            seller=seller or None,
+        )
+    ]
+
+
+def parse_offer_price(price_nodes) -> Price:
+    if not price_nodes:
+        return Price(amount=None, currency=None, amount_text=None)
+    return price_parser.parse(price_nodes[0].text_content())
+
+
+def price_in_reserve(total, reserve_min, reserve_max):
+    return (
+        total <= reserve_max or math.isclose(total, reserve_max, abs_tol=0.01)
+    ) and (total >= reserve_min or math.isclose(total, reserve_min, abs_tol=0.01))
+
+
+def offer_total(offer: OfferSnapshot):
+    return offer.price.amount + (offer.shipping.amount or 0)
+
+
+def offers_in_reserve(offers, reserve_min, reserve_max, free_shipping_only=False):
+    """Yields (index, offer) for every offer whose total price sits in the reserve window.
+
+    Offers after the first (pinned) one are listed by ascending price, so evaluation stops
+    as soon as an item price on its own is above the window."""
+    for idx, offer in enumerate(offers):
+        price_float = offer.price.amount
+        if price_float is None:
+            log.debug(f"Could not parse a price for offer {idx}")
+            continue
+        if idx > 0 and not price_in_reserve(price_float, float("-inf"), reserve_max):
             log.debug(
-                f"Assuming free shipping based on this message: '{shipping_text}'"
+                f"  Max ({reserve_max}) < Price ({price_float}), skipping the rest"
+            )
+            break
+        ship_float = offer.shipping.amount or 0
+        # If the user has specified that they only want free items, we can skip any items
+        # that have any shipping cost
+        if free_shipping_only and ship_float > 0:
+            continue
+
+        if price_in_reserve(price_float + ship_float, reserve_min, reserve_max):
+            yield idx, offer
+        elif reserve_min > (price_float + ship_float):
+            log.debug(
+                f"  Min ({reserve_min}) > Price ({price_float} + {ship_float} shipping)"
             )
-            return FREE_SHIPPING_PRICE
         else:
-            log.debug(f"Found {shipping_text} as a price.  Using that.")
-            shipping_cost: Price = parse_price(shipping_text)
+            log.debug(
+                f"  Max ({reserve_max}) < Price ({price_float} + {ship_float} shipping)"
+            )
+
+
+def rank_offers(candidates, max_condition):
+    """Drops duplicate offering IDs and offers below max_condition, then orders the rest
+    cheapest first, newest first on a tie"""
+    seen_ids = set()
+    ranked = []
+    for idx, offer in candidates:
+        # Lower condition value imply newer
+        if offer.condition and offer.condition.value > max_condition.value:
+            log.debug(
+                f"Skipping item because its condition is below the requested level: "
+                f"{offer.condition} is below {max_condition}"
+            )
+            continue
+        if offer.offering_id:
+            if offer.offering_id in seen_ids:
+                continue
+            seen_ids.add(offer.offering_id)
+        ranked.append((idx, offer))
+    ranked.sort(
+        key=lambda candidate: (
+            offer_total(candidate[1]),
+            (candidate[1].condition or AmazonItemCondition.New).value,
+        )
+    )
+    return ranked
+
+
+def next_element(node):
+    sibling = node.getnext()
+    while sibling is not None and not isinstance(sibling.tag, str):
+        sibling = sibling.getnext()
+    return sibling
+
+
+def load_sign_in_text(sign_in_text):
+    global sign_in_text_re
+    sign_in_text_re = re.compile("|".join(re.escape(text) for text in sign_in_text))
+
+
+def load_free_shipping_phrases(phrases):
+    global free_shipping_phrases
+    free_shipping_phrases = frozenset(normalise_phrase(phrase) for phrase in phrases)
+
+
+def normalise_phrase(text):
+    return " ".join(text.upper().split())
+
+
+def get_shipping_costs(tree) -> Price:
+    # Top level wrapper method to be be called by the main code.  The offer is walked
+    # once by the extractor, which resolves shipping from whichever markup it found.
+    return extract_offer_fields(tree).shipping
+
+
+def get_offer_shipping(delivery_price, delivery_message, alt_shipping_node) -> Price:
+    # Newer mechanisms are tried first, while still retaining fallback versions for older
+    # markup
+    if delivery_price is not None:
+        # The "data-csa-c-delivery-price" attribute will either be text indicating
+        # that it's free or the fixed price as a float
+        delivery_text = normalise_phrase(delivery_price)
+        if not delivery_text or delivery_text in DELIVERY_PRICE_FREE:
+            log.debug(
+                f"Assuming free shipping based on this message: '{delivery_price}'"
+            )
+            return FREE_SHIPPING_PRICE
+        log.debug(f"Found {delivery_price} as a price.  Using that.")
+        return price_parser.parse(delivery_price)
+
+    # Shipping pricing within a div with the explicit ID 'delivery-message'
+    if delivery_message is not None and delivery_message.text:
+        shipping_span_text = delivery_message.text.strip()
+        if (
+            not shipping_span_text
+            or normalise_phrase(shipping_span_text) in free_shipping_phrases
+        ):
+            log.debug(
+                f"Assuming free shipping based on this message: '{shipping_span_text}'"
+            )
+            return FREE_SHIPPING_PRICE
+        # will it parse?
+        shipping_cost: Price = price_parser.parse(shipping_span_text)
+        if shipping_cost.currency is not None:
+            log.debug(
+                f"Found parseable price with currency symbol: {shipping_cost.currency}"
+            )
             return shipping_cost
-    return None
-
-
-def get_shipping_costs_v2(tree):
-    # This version expects to find the shipping pricing within a div with the explicit ID 'delivery-message'
-    shipping_xpath = ".//div[@id='delivery-message']"
-    shipping_nodes = tree.xpath(shipping_xpath)
-    count = len(shipping_nodes)
-    if count > 0:
-        # Get the text out of the div and evaluate it
-        shipping_node = shipping_nodes[0]
-        if shipping_node.text:
-            shipping_span_text = shipping_node.text.strip()
-            if any(
-                shipping_span_text.upper() in free_message
-                for free_message in amazon_config["FREE_SHIPPING"]
-            ):
-                # We found some version of "free" inside the span.. but this relies on a match
-                log.debug(
-                    f"Assuming free shipping based on this message: '{shipping_span_text}'"
-                )
-                return FREE_SHIPPING_PRICE
-            else:
-                # will it parse?
-                shipping_cost: Price = parse_price(
-                    re.sub(r"(?:\s+|(?:&nbsp;)+)", "", shipping_span_text)
-                )
-                if shipping_cost.currency is not None:
-                    log.debug(
-                        f"Found parseable price with currency symbol: {shipping_cost.currency}"
-                    )
-                    return shipping_cost
 
-    return None
+    return get_alt_shipping_costs(alt_shipping_node)
 
 
-def get_alt_shipping_costs(tree, free_shipping_string) -> Price:
+def get_alt_shipping_costs(shipping_node) -> Price:
     # Assume Free Shipping and change otherwise
-
-    # Shipping collection xpath:
-    # .//div[starts-with(@id, 'aod-bottlingDepositFee-')]/following-sibling::span
-    shipping_xpath = (
-        ".//div[starts-with(@id, 'aod-bottlingDepositFee-')]/following-sibling::*[1]"
-    )
-    shipping_nodes = tree.xpath(shipping_xpath)
-    count = len(shipping_nodes)
-    log.debug(f"Found {count} shipping nodes.")
-    if count == 0:
+    if shipping_node is None:
         log.warning("No shipping nodes (standard or alt) found.  Assuming zero.")
         return FREE_SHIPPING_PRICE
-    elif count > 1:
-        log.warning("Found multiple shipping nodes.  Using the first.")
 
-    shipping_node = shipping_nodes[0]
     # Shipping information is found within either a DIV or a SPAN following the bottleDepositFee DIV
     # What follows is logic to parse out the various pricing formats within the HTML.  Not ideal, but
     # it's what we have to work with.
@@ -1943,22 +3734,14 @@ def get_alt_shipping_costs(tree, free_shipping_string) -> Price:
         #     <span class="a-size-base a-color-base">S$21.44</span>
         #     <span class="a-size-base a-color-base">shipping</span>
         # </div>
-        shipping_spans = shipping_node.xpath(".//span")
-        if shipping_spans:
-            log.debug(
-                f"Found {len(shipping_spans)} shipping SPANs within the shipping DIV"
-            )
-            # Look for a price
-            for shipping_span in shipping_spans:
-                if shipping_span.text and shipping_span.text != "+":
-                    shipping_cost: Price = parse_price(
-                        re.sub(r"(?:\s+|(?:&nbsp;)+)", "", shipping_span.text.strip())
+        for shipping_span in shipping_node.iter("span"):
+            if shipping_span.text and shipping_span.text != "+":
+                shipping_cost: Price = price_parser.parse(shipping_span.text)
+                if shipping_cost.currency is not None:
+                    log.debug(
+                        f"Found parseable price with currency symbol: {shipping_cost.currency}"
                     )
-                    if shipping_cost.currency is not None:
-                        log.debug(
-                            f"Found parseable price with currency symbol: {shipping_cost.currency}"
-                        )
-                        return shipping_cost
+                    return shipping_cost
 
         if shipping_span_text == "":
             # Assume zero shipping for an empty div
@@ -1980,21 +3763,19 @@ def get_alt_shipping_costs(tree, free_shipping_string) -> Price:
 
         shipping_spans = shipping_node.findall("span")
         shipping_bs = shipping_node.findall("b")
-        # shipping_is = shipping_node.findall("i")
-        shipping_is = shipping_node.xpath("//i[@aria-label]")
+        shipping_is = [
+            node for node in shipping_node.iter("i") if node.get("aria-label")
+        ]
         if len(shipping_spans) > 0:
             # If the span starts with a "& " it's free shipping (right?)
             if shipping_spans[0].text.strip() == "&":
                 # & Free Shipping message
                 log.debug("Found '& Free', assuming zero.")
             elif shipping_spans[0].text.startswith("+"):
-                return parse_price(
-                    re.sub(r"(?:\s+|(?:&nbsp;)+)", "", shipping_spans[0].text.strip())
-                )
+                return price_parser.parse(shipping_spans[0].text)
         elif len(shipping_bs) > 0:
             for message_node in shipping_bs:
-
-                if message_node.text.upper() in free_shipping_string:
+                if normalise_phrase(message_node.text or "") in free_shipping_phrases:
                     log.debug("Found free shipping string.")
                 else:
                     log.error(
@@ -2002,12 +3783,9 @@ def get_alt_shipping_costs(tree, free_shipping_string) -> Price:
                     )
         elif len(shipping_is) > 0:
             # If it has prime icon class, assume free Prime shipping
-            if "FREE" in shipping_is[0].attrib["aria-label"].upper():
+            if "FREE" in shipping_is[0].get("aria-label").upper():
                 log.debug("Found Free shipping with Prime")
-        elif any(
-            shipping_span_text.upper() in free_message
-            for free_message in amazon_config["FREE_SHIPPING"]
-        ):
+        elif normalise_phrase(shipping_span_text) in free_shipping_phrases:
             # We found some version of "free" inside the span.. but this relies on a match
             log.warning(
                 f"Assuming free shipping based on this message: '{shipping_span_text}'"
@@ -0,0 +1,102 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+import asyncio
+import time
+
+import aiohttp
+
+DEFAULT_RATE = 2.0  # requests per second, across all tasks
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 10
+
+
+class RequestBudget:
+    """Spaces requests out so that no more than rate of them start each second, however
+    many tasks share the budget"""
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.interval = 1 / rate
+        self.next_slot = 0.0
+
+    async def wait(self):
+        # Nothing is awaited between reading and moving next_slot, so tasks can't race
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def client_session(
+    cookies=None, headers=None, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT
+):
+    """A keep-alive session with a connection for each request that can be in flight"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=concurrency),
+        cookies=cookies,
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    )
+
+
+async def scan(session, jobs, evaluate, budget, concurrency=DEFAULT_CONCURRENCY):
+    """Fetches the (key, url) pairs that jobs yields, with up to concurrency requests in
+    flight and no more started than budget allows.
+
+    evaluate(key, status, text) is called for each response as it completes, so that
+    parsing one response overlaps the network waits of the others.  A status of 0 means
+    the request failed, with the error as text.  The first truthy result is returned
+    together with its key, and the requests still in flight are cancelled.  Returns None
+    if jobs runs out first.
+    """
+    found = asyncio.get_running_loop().create_future()
+    jobs = iter(jobs)
+
+    async def worker():
+        while not found.done():
+            # Taking the job once its slot comes up keeps it as fresh as it can be
+            await budget.wait()
+            try:
+                key, url = next(jobs)
+            except StopIteration:
+                return
+            try:
+                async with session.get(url, allow_redirects=False) as response:
+                    status, text = response.status, await response.text()
+            # ClientPayloadError, for a truncated body, is a ClientError too
+            except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError) as e:
+                status, text = 0, str(e) or type(e).__name__
+            result = evaluate(key, status, text)
+            if result and not found.done():
+                found.set_result((key, result))
+
+    workers = asyncio.gather(*(worker() for _ in range(concurrency)))
+    try:
+        await asyncio.wait([found, workers], return_when=asyncio.FIRST_COMPLETED)
+        if workers.done():
+            # Surfaces anything evaluate raised
+            workers.result()
+        return found.result() if found.done() else None
+    finally:
+        workers.cancel()
+        try:
+            await workers
+        except asyncio.CancelledError:
+            pass
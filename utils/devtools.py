@@ -0,0 +1,143 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+import base64
+import itertools
+import json
+
+import requests
+import websocket
+
+from utils.logger import log
+
+DEFAULT_DEVTOOLS_TIMEOUT = 10
+# Prefix older chromedrivers put in front of the DevTools target id of a window handle
+WINDOW_HANDLE_PREFIX = "CDwindow-"
+
+
+class DevToolsError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class DevToolsChannel:
+    """Talks to the DevTools endpoint of the tab WebDriver is driving, over a websocket
+    that stays open, without chromedriver in between.
+
+    Meant for read-only calls on the hot path.  Scripts written for execute_script run
+    unchanged, as long as what they return can be serialised to JSON, so they can't hand
+    back elements.  Clicks and navigation stay with WebDriver.
+    """
+
+    def __init__(self, timeout=DEFAULT_DEVTOOLS_TIMEOUT):
+        self.timeout = timeout
+        self.socket = None
+        self.ids = itertools.count(1)
+
+    @property
+    def connected(self):
+        return self.socket is not None
+
+    def connect(self, driver):
+        self.close()
+        try:
+            address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+            targets = requests.get(
+                f"http://{address}/json/list", timeout=self.timeout
+            ).json()
+            url = find_target(targets, driver.current_window_handle)
+            if url is None:
+                log.debug("No DevTools target found for the WebDriver window")
+                return False
+            # Chrome turns away websockets that send an Origin it wasn't told to allow
+            self.socket = websocket.create_connection(
+                url, timeout=self.timeout, suppress_origin=True
+            )
+        except Exception as e:
+            log.debug(f"DevTools channel unavailable: {e}")
+            self.socket = None
+            return False
+        return True
+
+    def close(self):
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            except Exception:
+                pass
+            self.socket = None
+
+    def call(self, method, params=None):
+        """Sends one DevTools command and returns its result, dropping any events that
+        arrive in the meantime"""
+        if self.socket is None:
+            raise DevToolsError("DevTools channel is not connected")
+        message_id = next(self.ids)
+        try:
+            self.socket.send(
+                json.dumps({"id": message_id, "method": method, "params": params or {}})
+            )
+            while True:
+                message = json.loads(self.socket.recv())
+                if message.get("id") == message_id:
+                    break
+        except (websocket.WebSocketException, OSError) as e:
+            # The socket can't be trusted to be in step with the browser any more
+            self.close()
+            raise DevToolsError(f"{method} failed: {e}") from e
+        if "error" in message:
+            raise DevToolsError(f"{method} failed: {message['error'].get('message')}")
+        return message["result"]
+
+    def execute_script(self, script, *args):
+        """Runs a script written for WebDriver's execute_script, with its arguments, and
+        returns its result by value"""
+        expression = f"(function() {{{script}\n}}).apply(null, {json.dumps(args)})"
+        result = self.call(
+            "Runtime.evaluate", {"expression": expression, "returnByValue": True}
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            description = details.get("exception", {}).get("description")
+            raise DevToolsError(description or details.get("text"))
+        return result["result"].get("value")
+
+    def title(self):
+        return self.execute_script("return document.title;")
+
+    def screenshot(self, file_name):
+        data = self.call("Page.captureScreenshot", {"format": "png"})["data"]
+        with open(file_name, "wb") as f:
+            f.write(base64.b64decode(data))
+
+
+def find_target(targets, window_handle):
+    """Returns the websocket URL of the page target behind a WebDriver window handle"""
+    page_id = target_id(window_handle)
+    for target in targets:
+        if target.get("type") == "page" and target.get("id") == page_id:
+            return target.get("webSocketDebuggerUrl")
+    return None
+
+
+def target_id(window_handle):
+    """Returns the DevTools target id of a WebDriver window handle"""
+    if window_handle.startswith(WINDOW_HANDLE_PREFIX):
+        return window_handle[len(WINDOW_HANDLE_PREFIX) :]
+    return window_handle
@@ -17,29 +17,78 @@
 #      The author may be contacted through the project's GitHub, at:
 #      https://github.com/Hari-Nagarajan/fairgame
 
+import time
+
+import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
+from utils.selenium_utils import add_cookies_to_session_from_driver
+
 DEFAULT_TIMEOUT = 5  # seconds
 
 
 class TimeoutHTTPAdapter(HTTPAdapter):
     def __init__(self, *args, **kwargs):
         self.timeout = kwargs.get("timeout", DEFAULT_TIMEOUT)
-        super().__init__(
-            max_retries=kwargs.get(
-                "max_retries",
-                Retry(
-                    total=10,
-                    backoff_factor=1,
-                    status_forcelist=[429, 500, 502, 503, 504],
-                    method_whitelist=["HEAD", "GET", "OPTIONS"],
-                ),
+        max_retries = kwargs.get("max_retries")
+        if max_retries is None:
+            max_retries = Retry(
+                total=10,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["HEAD", "GET", "OPTIONS"],
             )
-        )
+        super().__init__(max_retries=max_retries)
 
     def send(self, request, **kwargs):
         timeout = kwargs.get("timeout")
         if timeout is None:
             kwargs["timeout"] = self.timeout
         return super().send(request, **kwargs)
+
+
+class DriverSession:
+    """A pooled, keep-alive requests session that carries the cookies and user agent of
+    a logged-in WebDriver session.
+
+    Cookies are copied over again once the first of them expires, and whenever a
+    request gets redirected, which is how a stale session shows.
+    """
+
+    def __init__(self, driver, timeout=DEFAULT_TIMEOUT, max_retries=2):
+        self.session = requests.Session()
+        # Retries connection errors only; a slow answer is better left to the next check
+        adapter = TimeoutHTTPAdapter(timeout=timeout, max_retries=max_retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.driver = None
+        self.expires = None
+        self.attach(driver)
+
+    def attach(self, driver):
+        self.driver = driver
+        # Forces a refresh before the next request
+        self.expires = 0
+
+    def refresh(self):
+        self.session.cookies.clear()
+        cookies = add_cookies_to_session_from_driver(self.driver, self.session)
+        expiries = [cookie["expiry"] for cookie in cookies if "expiry" in cookie]
+        self.expires = min(expiries) if expiries else None
+        self.session.headers["User-Agent"] = self.driver.execute_script(
+            "return navigator.userAgent;"
+        )
+
+    def get(self, url, timeout=None):
+        """GETs url with the driver's session, or returns None if the request keeps
+        getting redirected after the cookies were refreshed"""
+        if self.expires is not None and time.time() >= self.expires:
+            self.refresh()
+        for attempt in range(2):
+            response = self.session.get(url, timeout=timeout, allow_redirects=False)
+            if not response.is_redirect:
+                return response
+            if attempt == 0:
+                self.refresh()
+        return None
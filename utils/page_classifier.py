@@ -0,0 +1,64 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+import re
+from typing import Optional
+
+# Titles such as "Amazon.co.uk: Shopping Basket" or "smile.Amazon.de" name the domain they
+# belong to.  Titles that don't are shared by every domain.
+TITLE_DOMAIN_RE = re.compile(r"^(?:smile\.)?(amazon\.(?:com?\.)?[a-z]{2,3})\b", re.I)
+
+
+def bare_domain(domain):
+    domain = domain.lower()
+    for prefix in ("www.", "smile."):
+        if domain.startswith(prefix):
+            domain = domain[len(prefix) :]
+    return domain
+
+
+class PageClassifier:
+    """Maps a page title to the config title list it belongs to with a dict lookup.
+
+    Lists are indexed in priority order, so a title found in several lists keeps the first
+    one, just as an if/elif chain over the lists would.  Titles naming some other Amazon
+    domain are indexed separately and only consulted when the domain's own index misses.
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.foreign = {}
+
+    def load(self, title_config, page_keys, domain=None):
+        self.index = {}
+        self.foreign = {}
+        domain = bare_domain(domain) if domain else None
+        for key in page_keys:
+            for title in title_config.get(key, []):
+                match = TITLE_DOMAIN_RE.match(title)
+                if domain and match and match.group(1).lower() != domain:
+                    self.foreign.setdefault(title, key)
+                else:
+                    self.index.setdefault(title, key)
+
+    def classify(self, title) -> Optional[str]:
+        page = self.index.get(title)
+        if page is None:
+            page = self.foreign.get(title)
+        return page
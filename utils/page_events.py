@@ -0,0 +1,195 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+import base64
+import json
+import re
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.devtools import target_id
+from utils.logger import log
+from utils.wait import wait_until
+
+# Chrome capabilities that make chromedriver log Page domain events for get_log()
+PERFORMANCE_LOG_CAPABILITY = {"performance": "ALL"}
+PERFORMANCE_LOG_PREFS = {"enableNetwork": False, "enablePage": True}
+# Network events as well, for capturing responses.  Every request the page makes is
+# logged then, so only ask for them when responses are to be captured.
+PERFORMANCE_LOG_NETWORK_PREFS = {"enableNetwork": True, "enablePage": True}
+
+DEFAULT_STAGE = "DOMContentLoaded"
+EVENT_POLL_INTERVAL = 0.01
+EVENT_MAX_POLL_INTERVAL = 0.05
+
+
+class PageEvents:
+    """Follows main frame navigations of the current tab through the DevTools events that
+    chromedriver writes to its performance log.  The log has every tab's events, so only
+    those of the tab given to follow() are kept.
+
+    Markers are wall clock milliseconds, the same clock the log entries are stamped with,
+    so taking one before an action costs no round trip to the browser.
+
+    With network events in the log, responses whose URL matches the pattern given to
+    capture() are recorded as they finish, so their bodies can be read straight away,
+    and the bytes transferred and requests blocked are added up.
+    """
+
+    def __init__(self):
+        self.driver = None
+        self.enabled = False
+        # DevTools target id of the followed tab, which log entries call the webview
+        self.webview = None
+        self.main_frame_id = None
+        self.loader_id = None
+        self.navigated_at = None
+        self.stages = {}
+        self.capture_re = None
+        # URLs of matching responses still loading, by request ID
+        self.pending = {}
+        # (timestamp, request ID) of matching responses that finished loading
+        self.captured = []
+        self.transferred = 0
+        self.blocked = 0
+
+    def attach(self, driver):
+        self.driver = driver
+        self.enabled = False
+        self.main_frame_id = None
+        self.loader_id = None
+        self.navigated_at = None
+        self.stages = {}
+        self.pending = {}
+        self.captured = []
+        try:
+            self.follow(driver.current_window_handle)
+            driver.execute_cdp_cmd("Page.enable", {})
+            driver.execute_cdp_cmd("Page.setLifecycleEventsEnabled", {"enabled": True})
+            # Also checks the performance log is there, and drops anything logged so far
+            driver.get_log("performance")
+        except (WebDriverException, AttributeError) as e:
+            log.debug(f"DevTools page events unavailable: {e}")
+            return False
+        self.enabled = True
+        return True
+
+    def capture(self, url_pattern):
+        """Records responses whose URL matches url_pattern from now on"""
+        self.capture_re = re.compile(url_pattern)
+
+    def follow(self, window_handle):
+        """Keeps the events of the tab behind window_handle from now on"""
+        self.webview = target_id(window_handle)
+
+    @staticmethod
+    def mark():
+        return time.time() * 1000
+
+    def read(self):
+        for entry in self.driver.get_log("performance"):
+            logged = json.loads(entry["message"])
+            if logged.get("webview", self.webview) != self.webview:
+                continue
+            message = logged["message"]
+            self.handle(
+                entry["timestamp"], message["method"], message.get("params", {})
+            )
+
+    def handle(self, timestamp, method, params):
+        if method == "Page.frameNavigated":
+            frame = params["frame"]
+            if frame.get("parentId"):
+                return
+            self.main_frame_id = frame["id"]
+            self.loader_id = frame.get("loaderId")
+            self.navigated_at = timestamp
+            self.stages = {}
+        elif method == "Page.lifecycleEvent":
+            if (
+                params.get("frameId") == self.main_frame_id
+                and params.get("loaderId") == self.loader_id
+            ):
+                self.stages.setdefault(params["name"], timestamp)
+        elif method == "Page.domContentEventFired":
+            self.stages.setdefault("DOMContentLoaded", timestamp)
+        elif method == "Page.loadEventFired":
+            self.stages.setdefault("load", timestamp)
+        elif method == "Network.responseReceived":
+            if self.capture_re and self.capture_re.search(params["response"]["url"]):
+                self.pending[params["requestId"]] = params["response"]["url"]
+        elif method == "Network.loadingFinished":
+            self.transferred += params.get("encodedDataLength", 0)
+            if self.pending.pop(params["requestId"], None) is not None:
+                self.captured.append((timestamp, params["requestId"]))
+        elif method == "Network.loadingFailed":
+            if "blockedReason" in params:
+                self.blocked += 1
+            self.pending.pop(params["requestId"], None)
+
+    def reached(self, since, stage=DEFAULT_STAGE):
+        """Whether a main frame navigation that started after since got to stage"""
+        return (
+            self.navigated_at is not None
+            and self.navigated_at >= since
+            and stage in self.stages
+        )
+
+    def wait_for_navigation(self, since, stage=DEFAULT_STAGE, timeout=None):
+        def arrived():
+            self.read()
+            return self.reached(since, stage)
+
+        return bool(
+            wait_until(
+                arrived,
+                timeout=timeout,
+                poll_interval=EVENT_POLL_INTERVAL,
+                max_poll_interval=EVENT_MAX_POLL_INTERVAL,
+            )
+        )
+
+    def wait_for_response(self, since, timeout=None):
+        """Returns the request ID of the first captured response that finished after
+        since, or None if none did in time"""
+
+        def finished():
+            self.read()
+            self.captured = [
+                (timestamp, request_id)
+                for timestamp, request_id in self.captured
+                if timestamp >= since
+            ]
+            return self.captured[0][1] if self.captured else None
+
+        return wait_until(
+            finished,
+            timeout=timeout,
+            poll_interval=EVENT_POLL_INTERVAL,
+            max_poll_interval=EVENT_MAX_POLL_INTERVAL,
+        )
+
+    def response_body(self, request_id):
+        result = self.driver.execute_cdp_cmd(
+            "Network.getResponseBody", {"requestId": request_id}
+        )
+        if result.get("base64Encoded"):
+            return base64.b64decode(result["body"]).decode("utf-8", "replace")
+        return result["body"]
@@ -0,0 +1,125 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from price_parser import parse_price, Price
+
+DEFAULT_CACHE_SIZE = 2048
+
+
+class PriceLocale(NamedTuple):
+    decimal: Optional[str]
+    thousands: Optional[str]
+    # Longest symbols first, so that "CDN$" wins over "$"
+    symbols: Tuple[str, ...]
+
+
+# Keyed by the domain without its "www." or "smile." prefix.  Thousands separators that are
+# spaces are None, since all whitespace is stripped before parsing.
+PRICE_LOCALES = {
+    "amazon.com": PriceLocale(".", ",", ("$",)),
+    "amazon.ca": PriceLocale(".", ",", ("CDN$", "$")),
+    "amazon.co.uk": PriceLocale(".", ",", ("£",)),
+    "amazon.sg": PriceLocale(".", ",", ("S$",)),
+    "amazon.de": PriceLocale(",", ".", ("€",)),
+    "amazon.es": PriceLocale(",", ".", ("€",)),
+    "amazon.it": PriceLocale(",", ".", ("€",)),
+    "amazon.nl": PriceLocale(",", ".", ("€",)),
+    "amazon.fr": PriceLocale(",", None, ("€",)),
+    "amazon.pl": PriceLocale(",", None, ("zł",)),
+    "amazon.se": PriceLocale(",", None, ("kr",)),
+    "amazon.com.tr": PriceLocale(",", ".", ("TL", "₺")),
+    "amazon.co.jp": PriceLocale(None, ",", ("￥", "¥")),
+}
+
+
+def get_price_locale(domain) -> Optional[PriceLocale]:
+    if not domain:
+        return None
+    domain = domain.lower()
+    for prefix in ("www.", "smile."):
+        if domain.startswith(prefix):
+            domain = domain[len(prefix) :]
+    return PRICE_LOCALES.get(domain)
+
+
+class PriceParser:
+    """Parses the handful of price formats a single Amazon domain prints.
+
+    Strings in the domain's own format are parsed without regular expressions, anything
+    else falls back to price_parser.  Results are kept in a bounded LRU cache keyed by the
+    raw string, since the same prices are seen on check after check.
+    """
+
+    def __init__(self, domain=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.locale = get_price_locale(domain)
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    def set_locale(self, domain):
+        self.locale = get_price_locale(domain)
+        self.parse.cache_clear()
+
+    def _parse(self, text) -> Price:
+        cleaned = "".join(text.replace("&nbsp;", " ").split())
+        price = self.parse_fast(cleaned)
+        if price is None:
+            price = parse_price(cleaned)
+        return price
+
+    def parse_fast(self, cleaned) -> Optional[Price]:
+        """Parses whitespace-free text in the configured locale, or returns None"""
+        if self.locale is None:
+            return None
+        for symbol in self.locale.symbols:
+            if cleaned.startswith(symbol):
+                number = cleaned[len(symbol) :]
+                break
+            if cleaned.endswith(symbol):
+                number = cleaned[: -len(symbol)]
+                break
+        else:
+            return None
+
+        whole, fraction = number, ""
+        if self.locale.decimal and self.locale.decimal in number:
+            whole, _, fraction = number.rpartition(self.locale.decimal)
+            if len(fraction) != 2 or not is_ascii_digits(fraction):
+                return None
+
+        groups = (
+            whole.split(self.locale.thousands) if self.locale.thousands else [whole]
+        )
+        if not all(is_ascii_digits(group) for group in groups):
+            return None
+        if len(groups) > 1 and (
+            len(groups[0]) > 3 or any(len(group) != 3 for group in groups[1:])
+        ):
+            return None
+
+        amount = "".join(groups)
+        if fraction:
+            amount = f"{amount}.{fraction}"
+        return Price(amount=Decimal(amount), currency=symbol, amount_text=number)
+
+
+def is_ascii_digits(text):
+    return text.isascii() and text.isdigit()
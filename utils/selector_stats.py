@@ -0,0 +1,80 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+import json
+import os
+
+from utils.logger import log
+
+
+class SelectorStats:
+    """Counts which alternative of each selector key matched, per Amazon domain.
+
+    The counts are kept in a JSON file of {domain: {key: {expression: hits}}} so they carry
+    over between runs, and are used to try the alternatives most likely to match first.
+    """
+
+    def __init__(self, path=None, domain=None):
+        self.path = path
+        self.domain = domain
+        self.hits = {}
+
+    def load(self, path, domain):
+        self.path = path
+        self.domain = domain
+        self.hits = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as stats_file:
+                    self.hits = json.load(stats_file)
+            except (OSError, ValueError) as e:
+                log.warning(f"Unable to read selector stats from {path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "w") as stats_file:
+                json.dump(self.hits, stats_file, indent=2, sort_keys=True)
+        except OSError as e:
+            log.warning(f"Unable to save selector stats to {self.path}: {e}")
+
+    def record(self, key, expression):
+        key_hits = self.hits.setdefault(self.domain, {}).setdefault(key, {})
+        key_hits[expression] = key_hits.get(expression, 0) + 1
+
+    def order(self, key, alternatives):
+        """Returns the alternatives with the most hits first, config order breaking ties"""
+        key_hits = self.hits.get(self.domain, {}).get(key)
+        if not key_hits:
+            return list(alternatives)
+        return sorted(alternatives, key=lambda expression: -key_hits.get(expression, 0))
+
+    def report(self, domain=None):
+        """Yields (domain, key, expression, hits, share of the key's hits) rows"""
+        for stats_domain, keys in sorted(self.hits.items()):
+            if domain and stats_domain != domain:
+                continue
+            for key, key_hits in sorted(keys.items()):
+                total = sum(key_hits.values())
+                for expression, hits in sorted(
+                    key_hits.items(), key=lambda item: -item[1]
+                ):
+                    share = hits / total if total else 0
+                    yield stats_domain, key, expression, hits, share
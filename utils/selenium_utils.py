@@ -145,10 +145,14 @@ def add_cookies_to_session_from_driver(driver, session):
                 domain=cookie["domain"],
                 name=cookie["name"],
                 value=cookie["value"],
+                path=cookie.get("path", "/"),
+                secure=cookie.get("secure", False),
+                expires=cookie.get("expiry"),
             )
         )
         for cookie in cookies
     ]
+    return cookies
 
 
 def enable_headless():
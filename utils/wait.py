@@ -0,0 +1,89 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+import time
+
+DEFAULT_POLL_INTERVAL = 0.05
+DEFAULT_MAX_POLL_INTERVAL = 0.25
+DEFAULT_BACKOFF = 1.5
+
+
+class Deadline:
+    """A point in time, on the monotonic clock, by which some piece of work has to finish.
+    A timeout of None never expires."""
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.expires = None if timeout is None else time.monotonic() + timeout
+
+    def remaining(self):
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def cap(self, timeout):
+        """Cuts timeout short to what is left before the deadline"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+def poll(
+    timeout=None,
+    deadline=None,
+    poll_interval=DEFAULT_POLL_INTERVAL,
+    max_poll_interval=DEFAULT_MAX_POLL_INTERVAL,
+    backoff=DEFAULT_BACKOFF,
+):
+    """Yields the attempt number until the deadline passes, sleeping between attempts.
+
+    The first attempt is made straight away.  The sleep starts at poll_interval and grows
+    by backoff up to max_poll_interval, and is cut short so that the last attempt lands
+    on the deadline.  Loops that break out early never sleep after their last attempt.
+    """
+    if deadline is None:
+        deadline = Deadline(timeout)
+    interval = poll_interval
+    attempt = 0
+    while True:
+        yield attempt
+        attempt += 1
+        remaining = deadline.remaining()
+        if remaining is not None and remaining <= 0:
+            return
+        time.sleep(interval if remaining is None else min(interval, remaining))
+        interval = min(interval * backoff, max_poll_interval)
+
+
+def wait_until(condition, ignored_exceptions=(), **poll_args):
+    """Calls condition until it returns something truthy and returns that, or None once
+    the deadline passes.  Exceptions in ignored_exceptions count as a falsy result.
+    Takes the same timeout, deadline and interval arguments as poll."""
+    for _ in poll(**poll_args):
+        try:
+            result = condition()
+        except ignored_exceptions:
+            continue
+        if result:
+            return result
+    return None
@@ -0,0 +1,155 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.logger import log
+
+DEFAULT_DRIVER_CALL_TIMEOUT = 60
+
+# Messages chromedriver answers with once the renderer or the whole browser has gone
+CRASH_MESSAGES = (
+    "tab crashed",
+    "page crash",
+    "chrome not reachable",
+    "target window already closed",
+    "disconnected: not connected to devtools",
+)
+
+
+class DriverHungException(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+def is_crash(exception):
+    message = str(exception).lower()
+    return any(crash in message for crash in CRASH_MESSAGES)
+
+
+class Watchdog:
+    """Bounds every WebDriver command with a deadline.
+
+    A single background thread waits for the deadline of the command in flight.  When
+    it passes, on_hang is called from that thread, and is expected to kill the browser
+    so that the blocked command returns.  From then on the watchdog stays tripped:
+    every command raises DriverHungException straight away, even where the caller
+    swallows exceptions, until reset() is called once the driver has been replaced.
+    """
+
+    def __init__(self, on_hang, timeout=DEFAULT_DRIVER_CALL_TIMEOUT):
+        self.on_hang = on_hang
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.armed = None
+        self.tripped = None
+        # Hung and crashed commands, by WebDriver command name
+        self.hangs = Counter()
+        self.crashes = Counter()
+        self.thread = None
+
+    def wrap(self, execute):
+        """Wraps a driver's execute method, which every command goes through"""
+
+        @wraps(execute)
+        def watched(command, params=None):
+            with self.watch(command):
+                try:
+                    return execute(command, params)
+                except WebDriverException as e:
+                    if is_crash(e):
+                        self.crashes[command] += 1
+                        self.trip(f"browser crashed during {command}: {e.msg}")
+                    raise
+
+        return watched
+
+    @contextmanager
+    def watch(self, command, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+        with self.condition:
+            if self.tripped is not None:
+                raise DriverHungException(self.tripped)
+            # Commands issued while another one is in flight run under its deadline
+            outer = self.armed is None
+            if outer:
+                self.armed = (time.monotonic() + timeout, command)
+                self.condition.notify()
+        self.start()
+        try:
+            yield
+        finally:
+            with self.condition:
+                if outer:
+                    self.armed = None
+                    self.condition.notify()
+                tripped = self.tripped
+            if tripped is not None:
+                raise DriverHungException(tripped)
+
+    def trip(self, reason):
+        with self.condition:
+            if self.tripped is None:
+                self.tripped = reason
+
+    def reset(self):
+        with self.condition:
+            self.armed = None
+            self.tripped = None
+            self.condition.notify()
+
+    def run(self):
+        with self.condition:
+            while True:
+                if self.armed is None:
+                    self.condition.wait()
+                    continue
+                expires, command = self.armed
+                remaining = expires - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+                self.armed = None
+                self.hangs[command] += 1
+                if self.tripped is None:
+                    self.tripped = f"{command} did not return within {self.timeout}s"
+                reason = self.tripped
+                # on_hang can block on process cleanup, so don't hold the lock for it
+                self.condition.release()
+                try:
+                    log.error(f"WebDriver hung: {reason}")
+                    self.on_hang()
+                except Exception as e:
+                    log.debug(f"Watchdog hang handler failed: {e}")
+                finally:
+                    self.condition.acquire()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(
+                target=self.run, name="webdriver-watchdog", daemon=True
+            )
+            self.thread.start()
@@ -0,0 +1,50 @@
+#      FairGame - Automated Purchasing Program
+#      Copyright (C) 2021  Hari Nagarajan
+#
+#      This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#      The author may be contacted through the project's GitHub, at:
+#      https://github.com/Hari-Nagarajan/fairgame
+
+from lxml import etree
+
+
+class XPathRegistry:
+    """Compiles each lxml XPath expression once and keeps the joined form of each
+    config XPATHS entry, so hot paths never re-parse or re-join an expression.
+    """
+
+    def __init__(self, separator=" | "):
+        self.separator = separator
+        self.compiled = {}
+        self.joined = {}
+        self.alternatives = {}
+
+    def compile(self, expression) -> etree.XPath:
+        compiled = self.compiled.get(expression)
+        if compiled is None:
+            compiled = self.compiled[expression] = etree.XPath(expression)
+        return compiled
+
+    def load(self, xpath_config):
+        """Pre-joins every key of an XPATHS config section"""
+        for key, alternatives in xpath_config.items():
+            self.register(key, alternatives)
+
+    def register(self, key, alternatives):
+        self.alternatives[key] = list(alternatives)
+        self.joined[key] = self.separator.join(alternatives)
+
+    def get(self, key):
+        return self.joined[key]